@@ -0,0 +1,77 @@
+"""Cost of building the pages for ``help`` with no arguments, rebuilding everything vs EmbedHelpCommand's HelpCache.
+
+Run with ``python -m benchmarks.help_command``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import discord
+from discord.ext import commands
+
+from light.bot.cogs.utils.help import EmbedHelpCommand, HelpCache
+
+COGS = 12
+COMMANDS_PER_COG = 10
+NUMBER = 200
+
+
+def make_command(cog: int, index: int) -> commands.Command:
+    async def callback(ctx, user: discord.User, amount: int = 1, *, reason: str = None) -> None:
+        """Does something very useful to {bot_mention}'s users.
+
+        Use {clean_prefix}help for more.
+        """
+
+    return commands.Command(callback, name=f"command{cog}_{index}", checks=[lambda ctx: True])
+
+
+async def old(
+    help: EmbedHelpCommand, mapping: dict[commands.Cog | None, list[commands.Command]]
+) -> list[discord.Embed]:
+    # what send_bot_help did before HelpCache
+    entries = []
+    for cog, commands in mapping.items():
+        if await help.filter_commands(commands):
+            name = getattr(cog, "qualified_name", "No Category")
+            embed = discord.Embed(title=f"{name}'s commands", colour=help.COLOUR)
+            value = "\n".join(f"**{c.name}**: {help.format_help(c.short_doc)}" for c in commands)
+            if cog and cog.description:
+                value = f"{cog.description}\n\n{value}"
+
+            embed.add_field(name="\u200b", value=value)
+
+            embed.set_footer(text=help.get_ending_note())
+            entries.append(embed)
+    return entries
+
+
+async def main() -> None:
+    async def can_run(ctx, *, call_once: bool = False) -> bool:
+        return True
+
+    bot = SimpleNamespace(user=SimpleNamespace(mention="<@1>"), help_cache=HelpCache(), can_run=can_run)
+    ctx = SimpleNamespace(bot=bot, clean_prefix="=", invoked_with="help", command=None, guild=None)
+    help = EmbedHelpCommand()
+    help.context = ctx
+    mapping = {
+        type(f"Cog{cog}", (commands.Cog,), {"__doc__": "Commands for {clean_prefix}things."})(): [
+            make_command(cog, index) for index in range(COMMANDS_PER_COG)
+        ]
+        for cog in range(COGS)
+    }
+
+    print(f"{COGS * COMMANDS_PER_COG} commands in {COGS} cogs, {NUMBER} iterations, µs per help")
+    for name, build in (("rebuild", old), ("HelpCache", EmbedHelpCommand.bot_help_pages)):
+        await build(help, mapping)  # warm the cache
+        start = time.perf_counter()
+        for _ in range(NUMBER):
+            await build(help, mapping)
+        print(f"{name:>10}: {(time.perf_counter() - start) / NUMBER * 1e6:8.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""Per-message cost of resolving a guild's prefixes, old closure vs the compiled PrefixMatcher.
+
+Run with ``python -m benchmarks.prefix_matcher``.
+"""
+
+from __future__ import annotations
+
+import timeit
+from types import SimpleNamespace
+
+import discord
+from discord.ext import commands
+
+from light.bot.cogs.utils.prefix import PrefixMatcher
+
+USER_ID = 659012420735467540
+PREFIXES = ["=", "!", "?", "$", "steam ", "light ", ">>", "l!", "s?", "."]
+MESSAGES = {
+    "chatter": "hello everyone, how's it going?",
+    "command": "steam user gobot1234",
+    "mention": f"<@!{USER_ID}> help",
+}
+NUMBER = 200_000
+
+
+def old(bot: SimpleNamespace, message: SimpleNamespace) -> str | None:
+    prefixes = commands.when_mentioned_or(*PREFIXES)(bot, message)
+    if message.content.startswith(tuple(prefixes)):  # what Bot.get_context does with the list
+        return discord.utils.find(message.content.startswith, prefixes)
+
+
+def new(matcher: PrefixMatcher, message: SimpleNamespace) -> str | None:
+    return matcher.match(message.content)
+
+
+def main() -> None:
+    bot = SimpleNamespace(user=SimpleNamespace(id=USER_ID))
+    matcher = PrefixMatcher(USER_ID, PREFIXES)
+    print(f"{len(PREFIXES)} prefixes, {NUMBER} iterations, ns per message")
+    for name, content in MESSAGES.items():
+        message = SimpleNamespace(content=content)
+        old_time = timeit.timeit(lambda: old(bot, message), number=NUMBER) / NUMBER * 1e9
+        new_time = timeit.timeit(lambda: new(matcher, message), number=NUMBER) / NUMBER * 1e9
+        print(
+            f"{name:>8}: when_mentioned_or {old_time:7.0f}  PrefixMatcher {new_time:7.0f}  ({old_time / new_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""SQL generation cost per call for the hot Table lookups, donphan's builders vs the cached ones on Table.
+
+Run with ``python -m benchmarks.table_queries``.
+"""
+
+from __future__ import annotations
+
+import timeit
+
+from donphan import Table as DonphanTable
+
+from light.db import Config, SteamUser
+from light.db.table import Table
+
+NUMBER = 100_000
+
+
+def fetch_row(table: type[Table], base: type, **values: object) -> str:
+    # what Table.fetch_row does before it reaches the connection
+    where = base._build_where_clause.__func__(table, values)
+    return base._build_query_fetch.__func__(table, where, None, None)
+
+
+def insert(table: type[Table], base: type, **values: object) -> str:
+    columns = table._get_columns(values)
+    return base._build_query_insert.__func__(table, columns, False, [Config.prefixes], [])
+
+
+CASES = {
+    "SteamUser.fetch_row(id=...)": lambda base: fetch_row(SteamUser, base, id=1),
+    "Config.fetch_row(guild_id=...)": lambda base: fetch_row(Config, base, guild_id=1),
+    "Config.insert(..., update_on_conflict=...)": lambda base: insert(Config, base, guild_id=1, prefixes=["="]),
+}
+
+
+def main() -> None:
+    print(f"{NUMBER} iterations, µs per call")
+    for name, case in CASES.items():
+        assert case(DonphanTable) == case(Table)
+        old = timeit.timeit(lambda: case(DonphanTable), number=NUMBER) / NUMBER * 1e6
+        new = timeit.timeit(lambda: case(Table), number=NUMBER) / NUMBER * 1e6
+        print(f"{name:>44}: donphan {old:6.2f}  cached {new:6.2f}  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import uvicorn
 
 from light.bot import Light
 from light.db import setup as db_setup
+from light.http import create_session
 from light.web import App
 
 app = typer.Typer()
@@ -13,10 +14,11 @@ app = typer.Typer()
 @app.command()
 async def main() -> None:
     db = await db_setup()
+    session = create_session()
 
-    bot = Light(db)
+    bot = Light(db, session)
 
-    web_app = App(db, bot)
+    web_app = App(db, bot, session)
     config = uvicorn.Config(web_app)
     server = uvicorn.Server(config)
     server.install_signal_handlers = lambda *args, **kwargs: None  # if it uses signal handlers everything breaks
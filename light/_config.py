@@ -7,3 +7,11 @@ WEBHOOK_URL = ""
 STEAM_USERNAME = ""
 STEAM_PASSWORD = ""
 STEAM_SHARED_SECRET = ""
+CONFIG_WARMUP = "stream"  # "stream" every config with a cursor at startup or "lazy"ily load them per guild
+STEAM_STATUS_INTERVAL = 60  # seconds between polls of steam's status endpoints
+STEAM_STATUS_TIMEOUT = 10
+TEMPLATE_CACHE_DIR = ".template_cache"  # where compiled jinja templates are kept between restarts
+TOKEN_REFRESH_INTERVAL = 60 * 60  # seconds between refreshing discord oauth tokens that expire within a day
+DEFER_EXTENSIONS = False  # load owner and jishaku on their first command rather than at startup
+STEAM_READY_TIMEOUT = 5  # seconds a steam command waits for the client to log in before saying it is still connecting
+CACHE_PROFILE = "default"  # "minimal", "default" or "full", see bot/cogs/utils/memory.py
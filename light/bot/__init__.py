@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import importlib
 import logging
+import time
 import traceback
 from pathlib import Path
 from typing import Any
@@ -11,49 +13,106 @@ import asyncpg
 import discord
 import steam
 from discord.ext import commands
-from steam.ext.commands.bot import resolve_path
 
 from light import config
-from light.db import Config
+from light.db import Config, SteamUser
+from light.profiling import STARTUP
+from light.utils import MISSING, SingleFlight, StaleWhileRevalidate, TTLCache
 
+from .cogs import COMMAND_ERRORS, COMMAND_LATENCY
 from .cogs.utils import logger
+from .cogs.utils.command_index import CommandIndex
+from .cogs.utils.configs import ConfigLoader
 from .cogs.utils.context import Context
 from .cogs.utils.formats import human_join
-from .cogs.utils.help import EmbedHelpCommand
+from .cogs.utils.game_details import GameDetailsCache
+from .cogs.utils.games import GameIndex
+from .cogs.utils.help import EmbedHelpCommand, HelpCache
+from .cogs.utils.memory import PROFILES
+from .cogs.utils.prefix import PrefixMatcher
 
 bot: Light
 
+COGS = Path(__file__).parent / "cogs"
+# if config.DEFER_EXTENSIONS these are loaded the first time one of their commands is used. They're listed by hand
+# so the extensions don't have to be imported to find out, keep them up to date when adding commands or aliases
+RARELY_USED_EXTENSIONS = {
+    "light.bot.cogs.owner": set("blacklist restart logout close eval e caches pollers pool memory reload".split()),
+    "jishaku": {"jishaku", "jsk"},
+}
+
+
+def find_extensions() -> list[str]:
+    return [
+        f"{__name__}.cogs.{path.stem}"
+        for path in sorted(COGS.iterdir())
+        if path.is_file() and path.suffix == ".py" and not path.name.startswith("_")
+    ]
+
 
 class Light(commands.Bot):
-    def __init__(self, db: asyncpg.Pool) -> None:
+    def __init__(self, db: asyncpg.Pool, session: aiohttp.ClientSession) -> None:
         mentions = discord.AllowedMentions(everyone=False, roles=False, users=True)
-        intents = discord.Intents.default()
+        self.cache_profile = PROFILES[config.CACHE_PROFILE]()
         super().__init__(
             command_prefix=Light.command_prefix,
             case_insensitive=True,
-            intents=intents,
             allowed_mentions=mentions,
             help_command=EmbedHelpCommand(),
+            **self.cache_profile.options(),
         )
 
         self.first_ready = True
         self.db = db
-        self.session = aiohttp.ClientSession()
+        self.session = session  # shared with the web app, see light.http
         self.client = steam.Client()
         self.launch_time = discord.utils.utcnow()
         self.configs: dict[int, Config] = {}
+        self.config_loader = ConfigLoader(self)
+        self.prefix_matchers: dict[int | None, PrefixMatcher] = {}
+        self.linked_accounts: TTLCache[int, int | None] = TTLCache(maxsize=10_000, ttl=60 * 60)
+        self.steam_lookups: SingleFlight[tuple[str, Any], Any] = SingleFlight(maxsize=1_000, ttl=60)
+        self.profile_summaries: StaleWhileRevalidate[int, Any] = StaleWhileRevalidate(
+            maxsize=10_000, ttl=10 * 60, max_age=24 * 60 * 60
+        )
+        self.game_index = GameIndex({})
+        self.game_details = GameDetailsCache(self)
+        self.help_cache = HelpCache()
+        self._command_index: CommandIndex | None = None
+        self.suggestion_cooldown = commands.CooldownMapping.from_cooldown(1, 10, commands.BucketType.channel)
+        self.deferred_extensions: list[str] = []
+        self.steam_task: asyncio.Task[None] | None = None
+        self.warmup_task: asyncio.Task[None] | None = None
 
         self.setup_logging()
 
-    async def command_prefix(self, message: discord.Message) -> list[str]:
+    async def command_prefix(self, message: discord.Message) -> str | tuple[str, ...]:
+        guild_id = message.guild.id if message.guild is not None else None
         try:
-            prefixes = ["=", ""] if message.guild is None else self.configs[message.guild.id].prefixes
+            matcher = self.prefix_matchers[guild_id]
         except KeyError:
-            prefixes = ["="]
-            self.configs[message.guild.id] = await Config.insert(
-                guild_id=message.guild.id, blacklisted=False, prefixes=prefixes
-            )
-        return commands.when_mentioned_or(*prefixes)(self, message)
+            try:
+                prefixes = ["=", ""] if guild_id is None else self.configs[guild_id].prefixes
+            except KeyError:  # serve the default prefixes until the config has been loaded
+                self.config_loader.load(guild_id)
+                matcher = PrefixMatcher(self.user.id, ConfigLoader.DEFAULT_PREFIXES)
+            else:
+                matcher = self.prefix_matchers[guild_id] = PrefixMatcher(self.user.id, prefixes)
+
+        prefix = matcher.match(message.content)
+        return matcher.prefixes if prefix is None else prefix
+
+    def refresh_prefixes(self, guild_id: int) -> None:
+        """Drop a guild's compiled prefixes so they are rebuilt from its config on the next message."""
+        self.prefix_matchers.pop(guild_id, None)
+
+    async def fetch_linked_id64(self, id: int) -> int | None:
+        """Get the id64 of the steam account linked to a discord user, if any."""
+        id64 = self.linked_accounts.get(id, MISSING)
+        if id64 is MISSING:
+            record = await SteamUser.fetch_row(id=id)
+            id64 = self.linked_accounts[id] = record.id64 if record is not None else None
+        return id64
 
     def setup_logging(self) -> None:
         self.webhook = discord.Webhook.from_url(config.WEBHOOK_URL, session=self.session)
@@ -62,41 +121,135 @@ class Light(commands.Bot):
         logging.getLogger("steam").setLevel(logging.INFO)
         logging.getLogger("matplotlib").setLevel(logging.WARNING)
         self.log = logger.WebhookLogger(self.webhook)
+        handler = logger.WebhookHandler(self.log)
+        logging.getLogger("light.db").addHandler(handler)
+        logging.getLogger("light.web").addHandler(handler)
         asyncio.create_task(self.log.sender())
         self.log.info("Finished setting up logging")
 
     async def start(self) -> None:
-        for extension in (
-            extensions := [
-                f
-                for f in Path("bot/cogs").iterdir()
-                if f.is_file() and f.suffix == ".py" and not f.name.startswith("_")
-            ]
-        ):
-            self.load_extension(resolve_path(extension))
-
-        self.load_extension("jishaku")
-
-        for guild in await Config.fetch():
-            if guild.blacklisted and (actual_guild := self.get_guild(guild.guild_id)):
-                await actual_guild.leave()
-                continue
-            self.configs[guild.guild_id] = guild
-
-        print(f"Extensions to be loaded are {human_join([str(f) for f in extensions])}")
-        await asyncio.gather(
-            self.client.start(config.STEAM_USERNAME, config.STEAM_PASSWORD, shared_secret=config.STEAM_SHARED_SECRET),
-            super().start(config.TOKEN),
-        )
+        extensions = [*find_extensions(), "jishaku"]
+        if config.DEFER_EXTENSIONS:
+            self.deferred_extensions = [extension for extension in extensions if extension in RARELY_USED_EXTENSIONS]
+            extensions = [extension for extension in extensions if extension not in RARELY_USED_EXTENSIONS]
+
+        print(f"Extensions to be loaded are {human_join(extensions)}")
+        await self.load_extensions(extensions)
+        if self.deferred_extensions:
+            print(f"Deferred loading {human_join(self.deferred_extensions)} until they're first needed")
+
+        if config.CONFIG_WARMUP == "stream":
+            self.warmup_task = asyncio.create_task(self.warmup_configs())
+
+        print(f"Startup timings:\n{STARTUP.report()}")
+        # steam logs in on the side so a slow login doesn't hold up discord or the web app,
+        # commands that need it wait briefly for it, see Steam.cog_check
+        self.steam_task = asyncio.create_task(self.start_steam())
+        await super().start(config.TOKEN)
+
+    async def start_steam(self) -> None:
+        try:
+            await asyncio.gather(
+                self.client.start(
+                    config.STEAM_USERNAME, config.STEAM_PASSWORD, shared_secret=config.STEAM_SHARED_SECRET
+                ),
+                self.wait_for_steam(),
+            )
+        except Exception:
+            self.log.error("The steam client stopped", exc_info=True)
+
+    async def wait_for_steam(self) -> None:
+        await self.client.wait_until_ready()
+        STARTUP.mark("ready: steam")
+        print(f"Logged into steam as: {self.client.user} - {self.client.user.id64}")
+        self.log.info(f"Logged into steam as: {self.client.user} - {self.client.user.id64}")
+
+    async def load_extensions(self, extensions: list[str]) -> None:
+        # importing is most of the cost and the extensions don't import each other, so warm them up concurrently.
+        # setup adds cogs and listeners to the bot so that still happens on the event loop one at a time
+        await asyncio.gather(*(asyncio.to_thread(self.import_extension, extension) for extension in extensions))
+        for extension in extensions:
+            with STARTUP.time(f"setup {extension}"):
+                self.load_extension(extension)
+
+    @staticmethod
+    def import_extension(name: str) -> None:
+        with STARTUP.time(f"import {name}"):
+            try:
+                importlib.import_module(name)
+            except Exception:
+                # load_extension imports it again and raises this with the full traceback, so this is just a heads up
+                logging.getLogger(__name__).warning(f"Failed to import {name}", exc_info=True)
+
+    async def load_deferred_extensions(self, name: str) -> bool:
+        """Load the deferred extensions if ``name`` is one of their commands, returns whether they were loaded.
+
+        They're all loaded together as owner's commands use jishaku's.
+        """
+        name = name.casefold()
+        if not any(name in RARELY_USED_EXTENSIONS[extension] for extension in self.deferred_extensions):
+            return False
+        extensions, self.deferred_extensions = self.deferred_extensions, []
+        await self.load_extensions(extensions)
+        self.log.info(f"Loaded deferred extensions {human_join(extensions)}")
+        return True
+
+    def add_command(self, command: commands.Command) -> None:
+        super().add_command(command)
+        self._command_index = None
+
+    def remove_command(self, name: str) -> commands.Command | None:
+        command = super().remove_command(name)
+        self._command_index = None
+        return command
+
+    @property
+    def command_index(self) -> CommandIndex:
+        """The index of every command name and alias, rebuilt on first use after commands are added or removed."""
+        if self._command_index is None:
+            self._command_index = CommandIndex(self.walk_commands())
+        return self._command_index
+
+    def load_extension(self, name: str, *, package: str | None = None) -> None:
+        super().load_extension(name, package=package)
+        self.help_cache.clear()
+
+    def unload_extension(self, name: str, *, package: str | None = None) -> None:
+        super().unload_extension(name, package=package)
+        self.help_cache.clear()
+
+    def reload_extension(self, name: str, *, package: str | None = None) -> None:
+        super().reload_extension(name, package=package)
+        self.help_cache.clear()
+
+    async def warmup_configs(self, chunk_size: int = 1_000) -> None:
+        """Stream every non-blacklisted config into :attr:`configs` with a server side cursor.
+
+        Blacklisted guilds are left when they become available, see :meth:`Listeners.on_guild_join`. The
+        :class:`ConfigLoader` waits for this to finish so it only queries the guilds the stream didn't have.
+        """
+        start = time.perf_counter()
+        fetched = 0
+        try:
+            async with self.db.acquire() as connection, connection.transaction():
+                async for record in connection.cursor(
+                    f"SELECT * FROM {Config._name} WHERE NOT blacklisted", prefetch=chunk_size
+                ):
+                    self.configs.setdefault(record.guild_id, record)
+                    fetched += 1
+        except Exception:
+            self.log.error("Failed to warm up the config cache", exc_info=True)
+        else:
+            self.log.info(f"Warmed up {fetched} configs in {time.perf_counter() - start:.2f}s")
 
     async def on_ready(self) -> None:
         if not self.first_ready:
             return
 
         self.first_ready = False
-        await self.client.wait_until_ready()
-        print(f"Logged in as: {self.user} - {self.user.id} | {self.client.user} - {self.client.user.id64}")
-        self.log.info(f"Logged in as: {self.user} - {self.user.id} | {self.client.user} - {self.client.user.id64}")
+        STARTUP.mark("ready: discord")
+        print(f"Logged in as: {self.user} - {self.user.id}")
+        self.log.info(f"Logged in as: {self.user} - {self.user.id}")
 
     async def on_error(self, event: str, *args: Any, **kwargs: Any) -> None:
         self.log.error(f"Error in {event}", exc_info=True)
@@ -117,12 +270,39 @@ class Light(commands.Bot):
     async def get_context(self, message: discord.Message) -> Context:
         return await super().get_context(message, cls=Context)
 
+    async def invoke(self, ctx: Context) -> None:
+        if ctx.command is None:
+            if ctx.invoked_with and ctx.prefix and await self.load_deferred_extensions(ctx.invoked_with):
+                ctx = await self.get_context(ctx.message)
+                if ctx.command is not None:
+                    return await self.invoke(ctx)
+            if ctx.invoked_with:
+                COMMAND_ERRORS.inc("", commands.CommandNotFound.__name__)
+                if (
+                    ctx.prefix
+                    and (matches := self.command_index.search(ctx.invoked_with))
+                    and not self.suggestion_cooldown.update_rate_limit(ctx.message)
+                ):
+                    suggestions = human_join([f"`{match}`" for match in matches], final="or")
+                    await ctx.send(f"Unknown command, did you mean {suggestions}?")
+            return await super().invoke(ctx)
+
+        start = time.perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            COMMAND_LATENCY.observe(time.perf_counter() - start, ctx.command.qualified_name)
+        if not ctx.command_failed:
+            milestone = f"first command: {'steam' if getattr(ctx.command.cog, 'requires_steam', False) else 'discord'}"
+            if STARTUP.mark(milestone):
+                self.log.info(f"Reached {milestone} {STARTUP.milestones[milestone]:.2f}s after startup")
+
     @property
     def client_secret(self) -> str:
         return config.CLIENT_SECRET
 
 
-async def setup(db: asyncpg.Pool) -> Light:
+async def setup(db: asyncpg.Pool, session: aiohttp.ClientSession) -> Light:
     global bot
-    bot = Light(db)
+    bot = Light(db, session)
     return bot
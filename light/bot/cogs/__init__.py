@@ -7,10 +7,28 @@ from typing import TYPE_CHECKING, Callable
 
 from discord.ext import commands
 
+from light import metrics
+
+# jishaku reads these when it's first imported, which .utils.converters does
+os.environ["JISHAKU_RETAIN"] = "true"
+os.environ["JISHAKU_NO_UNDERSCORE"] = "true"
+os.environ["JISHAKU_HIDE"] = "true"  # owner only, so keep it out of help and command suggestions
+
 from .utils import __
 
 if TYPE_CHECKING:
     from .. import Light
+    from .utils.context import Context
+
+
+COMMAND_LATENCY = metrics.Histogram(
+    "light_command_latency_seconds", "Time taken to invoke a command, including checks and conversion", ["command"]
+)
+CONVERSION_LATENCY = metrics.Histogram(
+    "light_command_conversion_seconds", "Time spent converting a command's arguments", ["command"]
+)
+CHECK_LATENCY = metrics.Histogram("light_command_check_seconds", "Time spent running a command's checks", ["command"])
+COMMAND_ERRORS = metrics.Counter("light_command_errors_total", "Errors raised by commands", ["command", "error"])
 
 
 class Cog(commands.Cog):
@@ -33,6 +51,18 @@ class TypedCommand(commands.Command):
 
         self._params = params
 
+    async def can_run(self, ctx: Context) -> bool:
+        with CHECK_LATENCY.time(self.qualified_name):
+            return await super().can_run(ctx)
+
+    async def _parse_arguments(self, ctx: Context) -> None:
+        with CONVERSION_LATENCY.time(self.qualified_name):
+            await super()._parse_arguments(ctx)
+
+    async def dispatch_error(self, ctx: Context, error: commands.CommandError) -> None:
+        COMMAND_ERRORS.inc(self.qualified_name, type(error).__name__)
+        await super().dispatch_error(ctx, error)
+
 
 class TypedGroup(TypedCommand, commands.Group):
     def command(self, *args, **kwargs) -> Callable[..., TypedCommand]:
@@ -44,6 +74,3 @@ class TypedGroup(TypedCommand, commands.Group):
 
 command: Callable[..., Callable[..., TypedCommand]] = partial(commands.command, cls=TypedCommand)
 group: Callable[..., Callable[..., TypedGroup]] = partial(commands.group, cls=TypedGroup)
-
-os.environ["JISHAKU_RETAIN"] = "true"
-os.environ["JISHAKU_NO_UNDERSCORE"] = "true"
@@ -20,21 +20,23 @@ class Listeners(Cog):
     async def cog_check(self, ctx: Context) -> Literal[False]:
         return False  # There shouldn't ever be any commands here
 
+    @commands.Cog.listener("on_guild_available")
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild) -> None:
-        config = await Config.fetch_row(guild_id=guild.id)
-        if config is None:
-            config = await Config.insert(guild_id=guild.id, prefixes=["="], returning="*")
-        elif config.blacklisted:
+        try:
+            config = await self.bot.config_loader.load(guild.id)
+        except Exception:
+            return  # the loader has logged it
+        if config is not None and config.blacklisted:
             self.bot.log.info(f"Leaving {guild.name!r} - {guild.id} as it is a blacklisted guild")
-            return await guild.leave()
-        self.bot.configs[config.guild_id] = config
+            await guild.leave()
 
     @commands.Cog.listener()
     async def on_guild_remove(self, guild: discord.Guild) -> None:
         if not (record := await Config.fetch_row(guild_id=guild.id)).blacklisted:
             await Config.delete_record(record)
             self.bot.configs.pop(guild.id)
+            self.bot.refresh_prefixes(guild.id)
             self.bot.log.info(f"Leaving guild {guild.name} - {guild.id}")
 
 
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import resource
 from typing import TYPE_CHECKING, Union
 
 import discord
 from discord.ext import commands
+from humanize import naturalsize
 from jishaku.codeblocks import Codeblock
 
+from light import config
+from light.db.pool import ACQUIRE_LATENCY, QUERY_LATENCY
+
 from . import Cog, command
 from .utils.checks import is_mod
 from .utils.context import Context
+from .utils.memory import sizeof
 
 if TYPE_CHECKING:
     from .. import Config, Light
@@ -43,6 +49,84 @@ class Owner(Cog, command_attrs=dict(hidden=True)):
     async def eval(self, ctx: Context, *, codeblock: Codeblock) -> None:
         await self.invoke_jsk_command("py", ctx, argument=codeblock)
 
+    @command()
+    @commands.is_owner()
+    async def caches(self, ctx: Context) -> None:
+        """Show the hit rates of the bot's caches"""
+        caches = {
+            "Linked accounts": self.bot.linked_accounts,
+            "Steam lookups": self.bot.steam_lookups.cache,
+            "Profile summaries": self.bot.profile_summaries.cache,
+            "Game details": self.bot.game_details.lookups.cache,
+        }
+        await ctx.send(
+            "\n".join(
+                f"{name}: {len(cache)} entries, {cache.hits} hits, {cache.misses} misses ({cache.hit_rate:.0%})"
+                for name, cache in caches.items()
+            )
+        )
+
+    @command()
+    @commands.is_owner()
+    async def pollers(self, ctx: Context) -> None:
+        """Show the latency and failure counts of the steam status poller"""
+        steam = self.bot.get_cog("Steam")
+        await ctx.send(
+            "\n".join(
+                f"{name}: last poll took {endpoint.latency or 0:.2f}s, "
+                f"{endpoint.failures}/{endpoint.polls} polls failed ({endpoint.consecutive_failures} in a row)"
+                for name, endpoint in steam.poller.endpoints.items()
+            )
+            or "Nothing has been polled yet"
+        )
+
+    @command()
+    @commands.is_owner()
+    async def pool(self, ctx: Context) -> None:
+        """Show the database pool's stats and the slowest statements"""
+        counts, total = ACQUIRE_LATENCY.values.get((), ([], [0.0]))
+        acquires = sum(counts)
+        lines = [
+            ", ".join(f"{name}: {value}" for name, value in self.bot.db.stats().items()),
+            f"{acquires} acquires averaging {total[0] / acquires * 1000 if acquires else 0:.2f}ms",
+            "",
+            "Slowest statements on average:",
+        ]
+        averages = []
+        for (statement,), (counts, total) in QUERY_LATENCY.values.items():
+            averages.append((total[0] / sum(counts), sum(counts), statement))
+        averages.sort(reverse=True)
+        lines += [f"`{average * 1000:.2f}ms` x{calls} {statement[:150]}" for average, calls, statement in averages[:5]]
+        await ctx.send("\n".join(lines))
+
+    @command()
+    @commands.is_owner()
+    async def memory(self, ctx: Context) -> None:
+        """Show roughly how much memory each of the bot's caches is using"""
+        bot = self.bot
+        caches = {
+            "Guilds": bot.guilds,
+            "Users": bot.users,
+            "Messages": bot.cached_messages,
+            "Configs": bot.configs,
+            "Prefix matchers": bot.prefix_matchers,
+            "Linked accounts": bot.linked_accounts,
+            "Steam lookups": bot.steam_lookups.cache,
+            "Profile summaries": bot.profile_summaries.cache,
+            "Game details": bot.game_details.lookups.cache,
+            "Game index": bot.game_index,
+            "Help": bot.help_cache.entries,
+            "Command index": bot.command_index,
+        }
+        lines = [f"Cache profile: {config.CACHE_PROFILE}"]
+        lines += [
+            f"{name}: {len(cache)} entries, ~{naturalsize(sizeof(cache), binary=True)}"
+            for name, cache in caches.items()
+        ]
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on linux
+        lines.append(f"Peak resident memory: {naturalsize(max_rss, binary=True)}")
+        await ctx.send("\n".join(lines))
+
     @command()
     async def reload(self, ctx: Context):
         # await self.invoke_jsk_command("reload", ctx)
@@ -40,6 +40,7 @@ class Staff(Cog):
 
         await Config.insert(prefixes=prefixes, guild_id=ctx.guild.id, update_on_conflict=Config.prefixes)
         prefixes.append(prefix)
+        self.bot.refresh_prefixes(ctx.guild.id)
         await ctx.send(f"Successfully added {prefix} to your prefixes")
 
     @prefix.command(name="remove")
@@ -52,6 +53,7 @@ class Staff(Cog):
             return await ctx.send(f"{prefix} isn't in your list of prefixes")
 
         await Config.insert(prefixes=prefixes, guild_id=ctx.guild.id, update_on_conflict=Config.prefixes)
+        self.bot.refresh_prefixes(ctx.guild.id)
         await ctx.send(f"Successfully removed {prefix} from prefixes")
 
 
@@ -1,23 +1,25 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
+from io import BytesIO
 from typing import TYPE_CHECKING, NamedTuple, NoReturn, Optional, TypedDict
 
 import discord
 from discord.ext import commands, tasks
-from humanize import naturaltime
-from jishaku.functools import executor_function
-
-# from matplotlib import pyplot as plt
-# from matplotlib.figure import figaspect
-from steam import Clan, Enum, FetchedGame, User
+from steam import Clan, Enum, User
 from steam.models import URL, api_route
 
-from light.db import SteamService
+from light import config
+from light.db import SteamService, retention
 
 from . import Cog, group
+from .utils import games
+from .utils.checks import SteamNotReady, wait_for_steam
 from .utils.context import Context
+from .utils.game_details import GameDetails
+from .utils.graphs import GraphRenderer
+from .utils.poller import Poller
 
 if TYPE_CHECKING:
     from light import Light
@@ -28,6 +30,12 @@ class UserStatsDataPoint(NamedTuple):
     count: int
 
 
+class ProfileSummary(NamedTuple):
+    friends: int
+    games: int
+    is_banned: bool
+
+
 class GameServersStatus(TypedDict):
     class App(TypedDict):  # type: ignore
         version: int
@@ -81,13 +89,32 @@ class GameServersStatus(TypedDict):
 class Steam(Cog):
     """The category for all steam related commands."""
 
+    requires_steam = True  # see Light.invoke
+
     def __init__(self, bot: Light):
         super().__init__(bot)
 
+        self.graphs = GraphRenderer()
+        self.poller = Poller(bot.session, timeout=config.STEAM_STATUS_TIMEOUT)
+        self.get_status.change_interval(seconds=config.STEAM_STATUS_INTERVAL)
         self.get_status.start()
+        self.refresh_game_index.start()
+        self.rollup_status.start()
 
     def cog_unload(self):
         self.get_status.cancel()
+        self.refresh_game_index.cancel()
+        self.rollup_status.cancel()
+        self.graphs.close()
+
+    async def cog_check(self, ctx: Context) -> bool:
+        if ctx.command in (self.steam, self.steam_stats):  # these only need the database
+            return True
+        return await wait_for_steam(ctx, config.STEAM_READY_TIMEOUT)
+
+    async def cog_command_error(self, ctx: Context, error: commands.CommandError) -> None:
+        if isinstance(error, SteamNotReady):
+            await ctx.send(str(error))
 
     def missing_argument(self, ctx: Context) -> NoReturn:  # once the defaults pr gets merged this can be removed
         raise commands.MissingRequiredArgument(ctx.current_parameter)
@@ -104,20 +131,25 @@ class Steam(Cog):
         if user is None:
             self.missing_argument(ctx)
 
-        friends, games, is_banned = await asyncio.gather(user.friends(), user.games(), user.is_banned())
+        summary = await self.bot.profile_summaries.fetch(user.id64, self.fetch_profile_summary, user)
         embed = discord.Embed(timestamp=user.created_at, colour=ctx.colour.steam)
         embed.set_author(name=user.name, url=user.community_url)
         embed.set_thumbnail(url=user.avatar_url)
         embed.add_field(name="64 bit ID:", value=user.id64)
-        embed.add_field(name="Friends:", value=len(friends))
-        embed.add_field(name="Games:", value=len(games))
+        embed.add_field(name="Friends:", value=summary.friends)
+        embed.add_field(name="Games:", value=summary.games)
         embed.add_field(name="Status:", value=user.state.name)
-        embed.add_field(name="Is Banned:", value=is_banned)
+        embed.add_field(name="Is Banned:", value=summary.is_banned)
         if user.game:
             embed.add_field(name="Currently playing:", value=user.game)
         embed.set_footer(text="Account created on")
         await ctx.send(embed=embed)
 
+    async def fetch_profile_summary(self, user: User) -> ProfileSummary:
+        # only the counts are kept, the friend and game lists can be thousands of entries long
+        friends, games, is_banned = await asyncio.gather(user.friends(), user.games(), user.is_banned())
+        return ProfileSummary(len(friends), len(games), is_banned)
+
     @steam.command(name="clan")
     async def steam_clan(self, ctx: Context, clan: Clan):
         embed = discord.Embed(timestamp=clan.created_at, colour=ctx.colour.steam)
@@ -134,14 +166,15 @@ class Steam(Cog):
     async def on_steam_subcommand_error(self, ctx: Context, error: commands.CommandError):
         if isinstance(error, commands.BadArgument):
             return await ctx.send(str(error))
-        raise error
+        if not isinstance(error, SteamNotReady):  # that's handled by cog_command_error
+            raise error
 
     @steam.command(name="game")
-    async def steam_game(self, ctx: Context, *, game: FetchedGame = None):
+    async def steam_game(self, ctx: Context, *, game: GameDetails = None):
         if game is None:
             user = await ctx.user
-            if user is not None:
-                game = user.game
+            if user is not None and user.game is not None:
+                game = await self.bot.game_details.fetch(user.game.id)
         if game is None:
             self.missing_argument(ctx)
         embed = discord.Embed(timestamp=game.created_at, colour=ctx.colour.steam)
@@ -149,7 +182,7 @@ class Steam(Cog):
         embed.set_thumbnail(url=game.logo_url)
         embed.add_field(name="ID:", value=game.id)
         embed.add_field(name="Description:", value=game.description)
-        embed.add_field(name="Is free:", value=str(game.is_free()).lower())
+        embed.add_field(name="Is free:", value=str(game.is_free).lower())
         embed.add_field(name="Developed by:", value=", ".join(game.developers))
         embed.add_field(name="Published by:", value=", ".join(game.publishers))
         embed.set_footer(text="Game created on")
@@ -157,9 +190,16 @@ class Steam(Cog):
 
     @steam.command(name="stats", aliases=["status", "s"])
     async def steam_stats(self, ctx: Context):
-        (recent,) = await SteamService.fetch(order_by=(SteamService.created_at, "DESC"), limit=1)
+        records = await SteamService.fetch(order_by=(SteamService.created_at, "DESC"), limit=1)
+        if not records:
+            return await ctx.send("There's no data on steam's status yet, try again in a minute")
+        (recent,) = records
+        graph = await self.graphs.status_graph(recent.created_at, self.fetch_status_history)
+        if graph is None:
+            return await ctx.send("There's no data on steam's status from the last day, try again in a minute")
+
         embed = discord.Embed(colour=ctx.colour.steam)
-        file = discord.File("steam_status.png")
+        file = discord.File(BytesIO(graph), filename="graph.png")
         embed.set_author(
             name=(
                 f"Steam Stats: {'fully operational' if recent.percent_up >= 80 else 'potentially unstable'} "
@@ -175,44 +215,36 @@ class Steam(Cog):
         embed.set_image(url="attachment://graph.png")
         await ctx.send(embed=embed, file=file)
 
-    @executor_function
-    def create_stats_graph(self, times: list[datetime], percentages: list[float]) -> None:
-        plt.style.use("dark_background")
-        w, h = figaspect(1 / 3)
-        fig, ax = plt.subplots(figsize=(w, h))
-        ax.grid(linestyle="-", linewidth="0.5", color="white")
-
-        plt.setp(plt.plot(list(reversed(times)), percentages, linewidth=4), color=str(Context.colour.steam))
-
-        plt.title(f"Steam CM status over the last {naturaltime(times[0])[:-4]}", size=20)
-        plt.axis([None, None, 0, 100])
-        plt.xlabel("Time (Month-Day Hour)", fontsize=20)
-        plt.ylabel("Uptime (%)", fontsize=20)
-
-        plt.tight_layout(h_pad=20, w_pad=20)
-        plt.savefig("steam_status.png", format="png", transparent=True)
+    async def fetch_status_history(self) -> tuple[list[datetime], list[float], list[float]]:
+        history = await retention.fetch_history(self.bot.db, discord.utils.utcnow() - timedelta(days=1))
+        return (
+            [point.created_at for point in history],
+            [point.percent_up for point in history],
+            [point.online_count for point in history],
+        )
 
     @tasks.loop(minutes=1)
     async def get_status(self) -> None:
-        await self.bot.client.wait_until_ready()
         now = discord.utils.utcnow()
 
-        online_count_resp, server_status_resp = await asyncio.gather(
-            self.bot.session.get(URL.STORE / "stats" / "userdata.json"),
-            self.bot.session.get(
-                api_route("ICSGOServers_730/GetGameServersStatus") % {"key": self.bot.client.http.api_key},
+        online_count_data, server_status_data = await asyncio.gather(
+            self.poller.poll(self.poller.add("online_count", URL.STORE / "stats" / "userdata.json")),
+            self.poller.poll(
+                self.poller.add(
+                    "server_status",
+                    api_route("ICSGOServers_730/GetGameServersStatus") % {"key": self.bot.client.http.api_key},
+                )
             ),
-            return_exceptions=False,
         )
 
-        if online_count_resp.status == 200:
-            data: list[UserStatsDataPoint] = (await online_count_resp.json())[0]["data"]
+        if online_count_data is not None:
+            data: list[UserStatsDataPoint] = online_count_data[0]["data"]
             online_count = data[0][1]
         else:
             online_count = -1
 
-        if server_status_resp.status == 200:
-            server_status: GameServersStatus = (await server_status_resp.json())["result"]
+        if server_status_data is not None:
+            server_status: GameServersStatus = server_status_data["result"]
             number_up = sum(
                 server["load"] != GameServersStatus.DataCenterInfo.Load.overload
                 for server in server_status["datacenters"].values()
@@ -231,7 +263,34 @@ class Steam(Cog):
             api_status=True,
             returning="*",
         )
-        # await self.create_stats_graph(times)
+
+    @get_status.before_loop
+    async def before_get_status(self) -> None:
+        await self.bot.client.wait_until_ready()  # the api key comes from logging in
+
+    @tasks.loop(hours=1)
+    async def rollup_status(self) -> None:
+        try:
+            await retention.rollup(self.bot.db)
+        except Exception:
+            self.bot.log.error("Failed to roll up the steam status history", exc_info=True)
+
+    @tasks.loop(hours=24)
+    async def refresh_game_index(self) -> None:
+        delay = 60
+        while True:
+            try:
+                self.bot.game_index = await games.load(self.bot.session, current=self.bot.game_index or None)
+            except Exception:
+                self.bot.log.error("Failed to refresh the game index", exc_info=True)
+                if self.bot.game_index:  # keep using the one we have until the next refresh
+                    return
+                # nothing has been loaded yet so game lookups can't work, try again soon rather than tomorrow
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30 * 60)
+            else:
+                self.bot.log.info(f"Loaded {len(self.bot.game_index)} steam apps into the game index")
+                return
 
 
 def setup(bot: Light) -> None:
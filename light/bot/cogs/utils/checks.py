@@ -24,6 +24,7 @@ DEALINGS IN THE SOFTWARE.
 
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING
 
 from discord.ext import commands
@@ -66,6 +67,29 @@ def has_guild_permissions(*, check=all, **perms: bool):
     return commands.check(pred)
 
 
+class SteamNotReady(commands.CheckFailure):
+    def __init__(self) -> None:
+        super().__init__("Steam is still connecting, try again in a moment")
+
+
+async def wait_for_steam(ctx: Context, timeout: float) -> bool:
+    """Give the steam client up to ``timeout`` seconds to finish logging in.
+
+    This only waits if ``ctx.command`` is the command being invoked. Checks also run for other commands, e.g. when help
+    filters the commands it shows, and those shouldn't be held up by steam, so they just get whether it's ready.
+    """
+    if ctx.bot.client.is_ready():
+        return True
+    invoked_with = (ctx.invoked_with or "").casefold()
+    if invoked_with not in (ctx.command.name, *ctx.command.aliases):
+        return False
+    try:
+        await asyncio.wait_for(ctx.bot.client.wait_until_ready(), timeout)
+    except asyncio.TimeoutError:
+        raise SteamNotReady from None
+    return True
+
+
 # These do not take channel overrides into account
 
 
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+from discord.ext import commands
+
+
+def deletions(name: str, distance: int) -> set[str]:
+    """Every string that can be made by deleting up to ``distance`` characters from ``name``."""
+    variants = {name}
+    frontier = {name}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1 :] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str) -> int:
+    """The optimal string alignment distance, i.e. Levenshtein with adjacent transpositions."""
+    previous_previous: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, a_char in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, b_char in enumerate(b, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a_char != b_char),
+            )
+            if i > 1 and j > 1 and a_char == b[j - 2] and a[i - 2] == b_char:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def max_distance(name: str) -> int:
+    """How many edits away a name can be to still count as a typo, single characters only match exactly."""
+    if len(name) <= 1:
+        return 0
+    return 1 if len(name) <= 4 else 2
+
+
+def names(command: commands.Command) -> Iterator[str]:
+    """The names a command can be invoked by, qualified by its parent's name."""
+    parent = command.full_parent_name
+    for name in (command.name, *command.aliases):
+        yield f"{parent} {name}" if parent else name
+
+
+class CommandIndex:
+    """A symmetric delete index over every visible command name and alias, including subcommands like ``steam user``.
+
+    Each name is stored under every string that can be made by deleting up to two characters from it, so a lookup
+    only has to generate the query's own deletions and check a handful of candidates instead of scanning every name.
+    """
+
+    def __init__(self, commands: Iterable[commands.Command]) -> None:
+        self.names: dict[str, str] = {}  # name or alias -> qualified name
+        self._deletions: dict[str, set[str]] = {}
+        for command in commands:
+            if command.hidden or any(parent.hidden for parent in command.parents):
+                continue  # suggestions go to anyone, so don't advertise these
+            for name in names(command):
+                self.names.setdefault(name, command.qualified_name)
+        self._longest = max(map(len, self.names), default=0)
+        for name in self.names:
+            for variant in deletions(name, max_distance(name)):
+                self._deletions.setdefault(variant, set()).add(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"<CommandIndex names={len(self)}>"
+
+    def search(self, query: str, *, n: int = 2) -> list[str]:
+        """Find up to ``n`` qualified command names that are within a couple of edits of ``query``."""
+        query = " ".join(query.casefold().split())
+        if query in self.names:
+            return [self.names[query]]
+        if len(query) > self._longest + max_distance(query):  # can't be close to anything, and slow to delete from
+            return []
+
+        limit = max_distance(query)
+        candidates: set[str] = set()
+        for variant in deletions(query, limit):
+            candidates |= self._deletions.get(variant, set())
+
+        scored = sorted(
+            (distance, len(name), name)
+            for name in candidates
+            if (distance := edit_distance(query, name)) <= min(limit, max_distance(name))
+        )
+        matches: list[str] = []
+        for _, _, name in scored:
+            if (qualified_name := self.names[name]) not in matches:
+                matches.append(qualified_name)
+            if len(matches) == n:
+                break
+        return matches
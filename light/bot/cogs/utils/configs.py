@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from light.db import Config
+
+if TYPE_CHECKING:
+    from light import Light
+
+
+class ConfigLoader:
+    """Loads guild configs into ``bot.configs`` in batches.
+
+    Concurrent loads for the same guild share one future, and guilds requested within ``BATCH_DELAY`` of each other
+    (e.g. a flood of GUILD_CREATEs) are fetched with a single query. Guilds without a config get the default one
+    inserted. Batches wait for :meth:`Light.warmup_configs` if it's running and skip the guilds it loaded.
+    """
+
+    BATCH_DELAY = 0.5
+    DEFAULT_PREFIXES = ["="]
+
+    def __init__(self, bot: Light) -> None:
+        self.bot = bot
+        self._in_flight: dict[int, asyncio.Future[Config | None]] = {}
+        self._batch: set[int] = set()
+        self._flush_task: asyncio.Task[None] | None = None
+
+    def load(self, guild_id: int) -> asyncio.Future[Config | None]:
+        """Queue a guild's config to be loaded. The returned future raises whatever fetching the batch raised."""
+        loop = asyncio.get_running_loop()
+        if (config := self.bot.configs.get(guild_id)) is not None:
+            future = loop.create_future()
+            future.set_result(config)
+            return future
+
+        try:
+            return self._in_flight[guild_id]
+        except KeyError:
+            pass
+
+        future = self._in_flight[guild_id] = loop.create_future()
+        self._batch.add(guild_id)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+        return future
+
+    async def _flush(self) -> None:
+        # guilds queued while a batch is being fetched go into the next batch
+        while self._batch:
+            await asyncio.sleep(self.BATCH_DELAY)
+            if (warmup := self.bot.warmup_task) is not None:
+                await asyncio.wait([warmup])  # the config stream will have most of these
+            guild_ids, self._batch = self._batch, set()
+            for guild_id in [guild_id for guild_id in guild_ids if guild_id in self.bot.configs]:
+                guild_ids.discard(guild_id)
+                self._in_flight.pop(guild_id).set_result(self.bot.configs[guild_id])
+            if not guild_ids:
+                continue
+            try:
+                configs = await self.fetch_many(guild_ids)
+            except Exception as exc:
+                self.bot.log.error(f"Failed to load the configs for {len(guild_ids)} guilds", exc_info=True)
+                for guild_id in guild_ids:
+                    future = self._in_flight.pop(guild_id)
+                    future.set_exception(exc)
+                    future.exception()  # it's been logged, so don't warn about futures nobody awaited
+                continue
+
+            for config in configs:
+                self.bot.configs[config.guild_id] = config
+                self.bot.refresh_prefixes(config.guild_id)
+            by_id = {config.guild_id: config for config in configs}
+            for guild_id in guild_ids:
+                self._in_flight.pop(guild_id).set_result(by_id.get(guild_id))
+
+    async def fetch_many(self, guild_ids: set[int]) -> list[Config]:
+        configs = await Config.fetch_where("guild_id = ANY($1)", list(guild_ids))
+        if missing := guild_ids.difference(config.guild_id for config in configs):
+            # the no-op update makes RETURNING give back rows that were created since the select
+            configs += await self.bot.db.fetch(
+                f"""
+                INSERT INTO {Config._name} (guild_id, prefixes)
+                SELECT guild_id, $2 FROM unnest($1::bigint[]) AS guild_id
+                ON CONFLICT (guild_id) DO UPDATE SET guild_id = EXCLUDED.guild_id
+                RETURNING *
+                """,
+                list(missing),
+                self.DEFAULT_PREFIXES,
+            )
+        return configs
@@ -8,8 +8,6 @@ from discord.ext import commands
 from discord.ext.commands.view import StringView
 from steam import HTTPException, User
 
-from light.db import SteamUser
-
 if TYPE_CHECKING:
     from light import Light
 
@@ -54,11 +52,11 @@ class Context(commands.Context):
     @property
     async def user(self) -> User | None:
         """The command invoker's steam account, if applicable"""
-        user = await SteamUser.fetch_row(id=self.author.id)
-        if user is None:
+        id64 = await self.bot.fetch_linked_id64(self.author.id)
+        if id64 is None:
             await self.send("A helpful message about how to get this to work")
             return
         try:
-            return self.bot.client.get_user(user.id64) or await self.bot.client.fetch_user(user.id64)
+            return self.bot.client.get_user(id64) or await self.bot.client.fetch_user(id64)
         except HTTPException:
             await self.send("Your account is private or steam is down")  # could actually use steam stats to tell :)
@@ -1,21 +1,18 @@
 from __future__ import annotations
 
-import difflib
-import re
 from typing import ClassVar, TypeVar
 
 import jishaku.codeblocks
 import steam
 from discord.ext import commands
-from discord.utils import get
-from steam.models import URL
-
-from light.db import SteamUser
 
 from .context import Context
+from .game_details import GameDetails
 
 T_co = TypeVar("T_co", covariant=True)
 
+MAX_BIGINT = 2**63 - 1  # anything bigger can't be looked up in postgres
+
 
 class TypeHintConverter(commands.Converter[T_co]):
     converter_for: ClassVar[type[T_co]]
@@ -26,6 +23,15 @@ class TypeHintConverter(commands.Converter[T_co]):
         commands.converter.CONVERTER_MAPPING[cls.converter_for] = cls
 
 
+async def fetch(ctx: Context, kind: str, id: int | str) -> steam.User | steam.Clan | steam.FetchedGame | None:
+    """Fetch a steam object, sharing the request with any concurrent lookups for the same object."""
+    return await ctx.bot.steam_lookups.fetch((kind, id), getattr(ctx.bot.client, f"fetch_{kind}"), id)
+
+
+async def id64_from_url(ctx: Context, url: str) -> int | None:
+    return await ctx.bot.steam_lookups.fetch(("url", url), steam.utils.id64_from_url, url, ctx.bot.session)
+
+
 class SteamUserConverter(TypeHintConverter[steam.User]):
     async def convert(self, ctx: Context, argument: str) -> steam.User:
         if argument.startswith("<@") and argument.endswith(">"):
@@ -34,19 +40,21 @@ class SteamUserConverter(TypeHintConverter[steam.User]):
             except commands.UserNotFound:
                 raise
 
-            user_record = await SteamUser.fetch_row(id=user.id)
-            user = await ctx.bot.client.fetch_user(user_record.id64)
+            id64 = await ctx.bot.fetch_linked_id64(user.id)
+            if id64 is None:
+                raise commands.BadArgument(f"{user} hasn't linked a steam account")
+            user = await fetch(ctx, "user", id64)
             if user:
                 return user
             raise commands.BadArgument(f"I couldn't find a matching steam user for {argument!r}")
 
         try:
-            user = await ctx.bot.client.fetch_user(argument)
+            user = await fetch(ctx, "user", argument)
         except steam.InvalidSteamID:
-            steam_id = await steam.utils.id64_from_url(argument, ctx.bot.session)
+            steam_id = await id64_from_url(ctx, argument)
             if steam_id is None:
                 raise commands.BadArgument(f"I couldn't find a matching ID or URL for {argument!r}")
-            user = await ctx.bot.client.fetch_user(steam_id)
+            user = await fetch(ctx, "user", steam_id)
 
         if user is None:
             raise commands.BadArgument(f"I couldn't find a matching steam user for {argument!r}")
@@ -56,59 +64,32 @@ class SteamUserConverter(TypeHintConverter[steam.User]):
 class SteamClanConverter(TypeHintConverter[steam.Clan]):
     async def convert(self, ctx: Context, argument: str) -> steam.Clan:
         try:
-            clan = await ctx.bot.client.fetch_clan(argument)
+            clan = await fetch(ctx, "clan", argument)
         except steam.InvalidSteamID:
-            steam_id = await steam.utils.id64_from_url(argument, ctx.bot.session)
+            steam_id = await id64_from_url(ctx, argument)
             if steam_id is None:
                 raise commands.BadArgument(f"I couldn't find a matching ID or URL for {argument!r}")
-            clan = await ctx.bot.client.fetch_clan(steam_id)
+            clan = await fetch(ctx, "clan", steam_id)
 
         if clan is None:
             raise commands.BadArgument(f"I couldn't find a matching steam clan for {argument!r}")
         return clan
 
 
-class SteamGameConverter(TypeHintConverter[steam.FetchedGame]):
-    async def convert(self, ctx: Context, argument: str) -> steam.FetchedGame:
+class GameDetailsConverter(TypeHintConverter[GameDetails]):
+    async def convert(self, ctx: Context, argument: str) -> GameDetails:
         try:
             id = int(argument)
         except ValueError:
-            resp = await ctx.bot.session.get(
-                URL.STORE
-                / "search"
-                / "results"
-                % {
-                    "start": 0,
-                    "count": 20,
-                    "infinite": 0,
-                    "json": "true",
-                    "term": argument,
-                }
-            )
-            data = await resp.json()
-            games = []
-            for game in data["items"]:
-                try:
-                    game = steam.Game(id=re.findall(r"steam/apps/(\d*)/", game["logo"])[0], title=game["name"])
-                    games.append(game)
-                except IndexError:
-                    pass  # not an app
-
-            if game_title := difflib.get_close_matches(argument, [game.title for game in games], n=1, cutoff=0.75):
-                game = get(games, title=game_title[0])
-                id = game.id
-            elif not (
-                id := {  # can't handle acronyms
-                    "csgo": 730,
-                    "cs-go": 730,
-                    "tf2": 440,
-                    "dota": 570,
-                    "dota2": 570,
-                }.get(argument.lower())
-            ):
+            if not ctx.bot.game_index:
+                raise commands.BadArgument("I'm still loading the list of steam games, try again in a minute")
+            id = ctx.bot.game_index.search(argument)
+            if id is None:
                 raise commands.BadArgument(f"I couldn't find a matching steam game for {argument!r}")
+        if not 0 <= id <= MAX_BIGINT:
+            raise commands.BadArgument(f"I couldn't find a matching steam game for {argument!r}")
 
-        game = await ctx.bot.client.fetch_game(id)
+        game = await ctx.bot.game_details.fetch(id)
         if game is None:
             raise commands.BadArgument(f"I couldn't find a matching steam game for {argument!r}")
         return game
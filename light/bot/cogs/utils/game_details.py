@@ -0,0 +1,87 @@
+"""A two tier cache of steam game details, an in-memory LRU in front of the :class:`SteamGame` table.
+
+Game metadata barely changes, so rows are only refetched from steam once they are older than ``MAX_AGE``. Fetches
+write through to the table, which means a restart starts with a warm second tier.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import discord
+import steam
+
+from light.db import SteamGame
+from light.utils import SingleFlight
+
+if TYPE_CHECKING:
+    from light import Light
+
+MAX_AGE = timedelta(days=7)
+
+
+@dataclasses.dataclass
+class GameDetails:
+    id: int
+    title: str
+    url: str
+    logo_url: str
+    description: str
+    is_free: bool
+    developers: list[str]
+    publishers: list[str]
+    created_at: datetime | None
+    fetched_at: datetime
+
+    @classmethod
+    def from_game(cls, game: steam.FetchedGame) -> GameDetails:
+        return cls(
+            id=game.id,
+            title=game.title,
+            url=game.url,
+            logo_url=game.logo_url,
+            description=game.description,
+            is_free=game.is_free(),
+            developers=list(game.developers),
+            publishers=list(game.publishers),
+            created_at=game.created_at,
+            fetched_at=discord.utils.utcnow(),
+        )
+
+    @classmethod
+    def from_record(cls, record: SteamGame) -> GameDetails:
+        return cls(**{field.name: record[field.name] for field in dataclasses.fields(cls)})
+
+
+class GameDetailsCache:
+    def __init__(
+        self, bot: Light, *, maxsize: int = 5_000, ttl: float = 24 * 60 * 60, not_found_ttl: float = 5 * 60
+    ) -> None:
+        self.bot = bot
+        # steam might just have failed to answer, so don't remember that a game wasn't found for as long
+        self.lookups: SingleFlight[int, GameDetails | None] = SingleFlight(
+            maxsize, ttl, ttl_for=lambda details: not_found_ttl if details is None else None
+        )
+        self.steam_fetches = 0
+
+    async def fetch(self, id: int) -> GameDetails | None:
+        return await self.lookups.fetch(id, self.load, id)
+
+    async def load(self, id: int) -> GameDetails | None:
+        record = await SteamGame.fetch_row(id=id)
+        if record is not None and discord.utils.utcnow() - record.fetched_at < MAX_AGE:
+            return GameDetails.from_record(record)
+
+        self.steam_fetches += 1
+        game = await self.bot.client.fetch_game(id)
+        if game is None:
+            return GameDetails.from_record(record) if record is not None else None
+
+        details = GameDetails.from_game(game)
+        await SteamGame.insert(
+            **dataclasses.asdict(details),
+            update_on_conflict=[column for column in SteamGame._columns if not column.primary_key],
+        )
+        return details
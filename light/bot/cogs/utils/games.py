@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import re
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+
+import aiohttp
+from steam.models import URL
+
+SNAPSHOT = Path(__file__).resolve().parents[4] / "app_list.json"  # next to the package, wherever we're run from
+MAX_SNAPSHOT_AGE = 24 * 60 * 60
+CANDIDATE_BUDGET = 4_000  # number of postings to walk before we stop gathering candidates
+CONTAINMENT_CUTOFF = 0.85  # how much of a partial title like "apex" or "witcher 3" a title has to contain
+MIN_CONTAINED_GRAMS = 4  # shorter queries are contained in far too many titles to mean anything
+
+ALIASES = {
+    "csgo": 730,
+    "cs go": 730,
+    "cs": 730,
+    "tf2": 440,
+    "tf": 440,
+    "dota": 570,
+    "dota2": 570,
+    "gmod": 4000,
+    "l4d": 500,
+    "l4d2": 550,
+    "hl": 70,
+    "hl2": 220,
+    "pubg": 578080,
+    "gta5": 271590,
+    "gtav": 271590,
+    "gta v": 271590,
+    "r6": 359550,
+    "r6s": 359550,
+    "rl": 252950,
+    "ets2": 227300,
+    "ksp": 220200,
+    "ror2": 632360,
+    "bg3": 1086940,
+}
+
+
+def normalise(title: str) -> str:
+    return " ".join(re.findall(r"\w+", title.casefold()))
+
+
+def trigrams(normalised: str) -> set[str]:
+    padded = f"  {normalised} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class GameIndex:
+    """An in-memory index of app id to title that answers fuzzy title lookups without a network request."""
+
+    def __init__(self, apps: dict[int, str], fetched_at: float = 0) -> None:
+        self.apps = apps
+        self.fetched_at = fetched_at
+        self._exact: dict[str, int] = {}
+        self._normalised: dict[int, str] = {}
+        self._trigrams: dict[str, array[int]] = {}
+
+        for id, title in sorted(apps.items()):
+            if not (normalised := normalise(title)):
+                continue
+            self._normalised[id] = normalised
+            self._exact.setdefault(normalised, id)  # the lowest id is usually the base game rather than a DLC
+            for gram in trigrams(normalised):
+                try:
+                    self._trigrams[gram].append(id)
+                except KeyError:
+                    self._trigrams[gram] = array("I", (id,))
+
+    def __len__(self) -> int:
+        return len(self.apps)
+
+    def __repr__(self) -> str:
+        return f"<GameIndex apps={len(self)} fetched_at={self.fetched_at}>"
+
+    def search(self, query: str, *, cutoff: float = 0.6) -> int | None:
+        """Find the id of the app whose title most closely matches ``query``, or failing that one that contains it."""
+        normalised = normalise(query)
+        if (id := ALIASES.get(normalised) or self._exact.get(normalised)) is not None:
+            return id
+
+        query_grams = trigrams(normalised)
+        postings = sorted((self._trigrams[gram] for gram in query_grams if gram in self._trigrams), key=len)
+        counts = Counter[int]()
+        walked = walked_grams = 0
+        for posting in postings:  # walk the rarest trigrams first so common ones like " th" don't dominate
+            if walked and walked + len(posting) > CANDIDATE_BUDGET:
+                break
+            counts.update(posting)
+            walked += len(posting)
+            walked_grams += 1
+
+        best_score, best_id = 0.0, None
+        for id, _ in heapq.nlargest(20, counts.items(), key=lambda item: item[1]):
+            grams = trigrams(self._normalised[id])
+            score = 2 * len(query_grams & grams) / (len(query_grams) + len(grams))
+            if score > best_score or score == best_score and best_id is not None and id < best_id:
+                best_score, best_id = score, id
+
+        if best_score >= cutoff:
+            return best_id
+        if len(query_grams) < MIN_CONTAINED_GRAMS:
+            return None
+        return self._search_contained(normalised, query_grams, counts, walked_grams)
+
+    def _search_contained(
+        self, normalised: str, query_grams: set[str], counts: Counter[int], walked_grams: int
+    ) -> int | None:
+        """Find the app whose title contains most of ``query``, preferring titles that start with it and then the
+        shortest, so "apex" finds Apex Legends rather than one of its DLCs.
+        """
+        needed = CONTAINMENT_CUTOFF * walked_grams
+        candidates = heapq.nsmallest(
+            20,
+            (id for id, count in counts.items() if count >= needed),
+            key=lambda id: (
+                -counts[id],
+                not self._normalised[id].startswith(normalised),
+                len(self._normalised[id]),
+                id,
+            ),
+        )
+        for id in candidates:
+            if len(query_grams & trigrams(self._normalised[id])) >= CONTAINMENT_CUTOFF * len(query_grams):
+                return id
+        return None
+
+    def save(self, path: Path = SNAPSHOT) -> None:
+        path.write_text(json.dumps({"fetched_at": self.fetched_at, "apps": self.apps}))
+
+    @classmethod
+    def from_snapshot(cls, path: Path = SNAPSHOT) -> GameIndex | None:
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        return cls({int(id): title for id, title in data["apps"].items()}, data["fetched_at"])
+
+
+async def fetch_app_list(session: aiohttp.ClientSession) -> dict[int, str]:
+    # the full app list is tens of megabytes, so don't hold it to the shared session's default timeout
+    timeout = aiohttp.ClientTimeout(total=120, connect=10)
+    async with session.get(URL.API / "ISteamApps" / "GetAppList" / "v2", timeout=timeout) as resp:
+        resp.raise_for_status()
+        data = await resp.json()
+    return {app["appid"]: app["name"] for app in data["applist"]["apps"] if app["name"]}
+
+
+async def load(session: aiohttp.ClientSession, *, current: GameIndex | None = None) -> GameIndex:
+    """Fetch the full app list and build a new index from it.
+
+    Without a ``current`` index the on-disk snapshot is used if it is fresh enough, and a stale one is still used if
+    steam can't be reached. With one, it is returned as is if steam can't be reached. Building the index is CPU bound
+    so it happens in an executor.
+    """
+    loop = asyncio.get_running_loop()
+    fallback = current
+    if fallback is None:
+        fallback = await loop.run_in_executor(None, GameIndex.from_snapshot)
+        if fallback is not None and time.time() - fallback.fetched_at < MAX_SNAPSHOT_AGE:
+            return fallback
+
+    try:
+        apps = await fetch_app_list(session)
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        if fallback is None:
+            raise
+        return fallback
+
+    index = await loop.run_in_executor(None, GameIndex, apps, time.time())
+    await loop.run_in_executor(None, index.save)
+    return index
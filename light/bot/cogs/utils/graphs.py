@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+
+from humanize import naturaldelta
+
+from light.utils import SingleFlight
+
+STEAM_BLUE = "#00adee"
+
+
+def render_status_graph(times: list[datetime], percentages: list[float], online_counts: list[float]) -> bytes:
+    """Draw the CM uptime and online player count as a PNG. This runs in a worker process."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib import pyplot as plt
+    from matplotlib.figure import figaspect
+
+    plt.style.use("dark_background")
+    fig, ax = plt.subplots(figsize=figaspect(1 / 3))
+    try:
+        ax.grid(linestyle="-", linewidth="0.5", color="white")
+        ax.plot(times, percentages, linewidth=4, color=STEAM_BLUE)
+        ax.set_ylim(0, 100)
+        ax.set_xlabel("Time (Month-Day Hour)", fontsize=20)
+        ax.set_ylabel("Uptime (%)", fontsize=20)
+        ax.set_title(f"Steam CM status over the last {naturaldelta(times[-1] - times[0])}", size=20)
+
+        online = ax.twinx()
+        online.plot(times, online_counts, linewidth=2, color="white", alpha=0.6)
+        online.set_ylabel("Players online", fontsize=20)
+
+        fig.tight_layout(h_pad=20, w_pad=20)
+        buffer = BytesIO()
+        fig.savefig(buffer, format="png", transparent=True)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+class GraphRenderer:
+    """Renders graphs in a process pool so matplotlib never blocks the event loop.
+
+    Images are cached by the newest data point they show, so repeated requests between polls share a single render.
+    """
+
+    def __init__(self, max_workers: int = 1) -> None:
+        # forking a process that's running threads (to_thread, the default executor, uvicorn) can deadlock the child
+        context = multiprocessing.get_context("forkserver")
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        self.renders: SingleFlight[datetime, bytes | None] = SingleFlight(maxsize=1, ttl=60 * 60)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def status_graph(
+        self, newest: datetime, fetch: Callable[[], Awaitable[tuple[list[datetime], list[float], list[float]]]]
+    ) -> bytes | None:
+        """Get the status graph for the data up to ``newest``, only calling ``fetch`` if it needs to be drawn.
+
+        Returns ``None`` if there's no data to draw.
+        """
+        return await self.renders.fetch(newest, self._render_status_graph, fetch)
+
+    async def _render_status_graph(
+        self, fetch: Callable[[], Awaitable[tuple[list[datetime], list[float], list[float]]]]
+    ) -> bytes | None:
+        data = await fetch()
+        if not data[0]:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(self.executor, render_status_graph, *data)
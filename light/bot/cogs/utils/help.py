@@ -1,14 +1,47 @@
 from __future__ import annotations
 
-import difflib
+import dataclasses
 
 import discord
 from discord.ext import commands, menus
 
+from light.utils import TTLCache
+
 from .context import Context
 from .paginator import InfoPaginator
 
 
+@dataclasses.dataclass
+class CommandEntry:
+    """The parts of a command's help that don't depend on who is asking."""
+
+    line: str  #: The line shown for the command on the bot's help pages
+    signature: str
+    short_doc: str
+
+
+@dataclasses.dataclass
+class HelpEntries:
+    """The formatted help for a cog or a group and every command in it."""
+
+    description: str
+    commands: dict[commands.Command, CommandEntry]
+
+
+class HelpCache:
+    """Formatted help for each cog and group, keyed by the prefix they were formatted with.
+
+    The bot clears this whenever an extension is loaded, unloaded or reloaded, so it never goes out of date. Entries
+    also expire after ``ttl`` seconds so the pages for prefixes that are rarely used don't stick around.
+    """
+
+    def __init__(self, maxsize: int = 1_000, ttl: float = 60 * 60) -> None:
+        self.entries: TTLCache[tuple[str, str | None, str], HelpEntries] = TTLCache(maxsize, ttl)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
 class EmbedHelpCommand(commands.HelpCommand):
     context: Context
     COLOUR = discord.Colour.blurple()
@@ -22,37 +55,73 @@ class EmbedHelpCommand(commands.HelpCommand):
     def format_help(self, string: str) -> str:
         return string.format(clean_prefix=self.context.clean_prefix, bot_mention=self.context.bot.user.mention)
 
-    async def send_bot_help(self, mapping: dict[commands.Cog, list[commands.Command]]) -> None:
-        entries = []
+    @property
+    def cache(self) -> HelpCache:
+        return self.context.bot.help_cache
+
+    def command_entry(self, command: commands.Command) -> CommandEntry:
+        short_doc = self.format_help(command.short_doc)
+        return CommandEntry(
+            line=f"**{command.name}**: {short_doc}",
+            signature=self.get_command_signature(command),
+            short_doc=short_doc or "...",
+        )
+
+    def help_entries(
+        self, kind: str, name: str | None, description: str | None, commands: list[commands.Command]
+    ) -> HelpEntries:
+        key = (kind, name, self.context.clean_prefix)
+        entries = self.cache.entries.get(key)
+        if entries is None:
+            entries = self.cache.entries[key] = HelpEntries(
+                self.format_help(description) if description else "",
+                {command: self.command_entry(command) for command in commands},
+            )
+        return entries
+
+    def cog_entries(self, cog: commands.Cog | None, commands: list[commands.Command]) -> HelpEntries:
+        return self.help_entries("cog", cog.qualified_name if cog else None, cog and cog.description, commands)
+
+    def add_command_fields(self, embed: discord.Embed, entries: HelpEntries, commands: list[commands.Command]) -> None:
+        for command in commands:
+            entry = entries.commands.get(command) or self.command_entry(command)
+            embed.add_field(name=entry.signature, value=entry.short_doc, inline=False)
+
+    async def bot_help_pages(self, mapping: dict[commands.Cog | None, list[commands.Command]]) -> list[discord.Embed]:
+        pages = []
+        ending_note = self.get_ending_note()
         for cog, commands in mapping.items():
-            if await self.filter_commands(commands):
+            filtered = await self.filter_commands(commands)  # the only part that depends on who is asking
+            if filtered:
                 name = getattr(cog, "qualified_name", "No Category")
                 embed = discord.Embed(title=f"{name}'s commands", colour=self.COLOUR)
-                value = "\n".join(f"**{c.name}**: {self.format_help(c.short_doc)}" for c in commands)
-                if cog and cog.description:
-                    value = f"{cog.description}\n\n{value}"
+                entries = self.cog_entries(cog, commands)
+                value = "\n".join(
+                    (entries.commands.get(command) or self.command_entry(command)).line for command in filtered
+                )
+                if entries.description:
+                    value = f"{entries.description}\n\n{value}"
 
                 embed.add_field(name="\u200b", value=value)
 
-                embed.set_footer(text=self.get_ending_note())
-                entries.append(embed)
+                embed.set_footer(text=ending_note)
+                pages.append(embed)
+        return pages
 
-        source = menus.ListPageSource(entries, per_page=1)
+    async def send_bot_help(self, mapping: dict[commands.Cog | None, list[commands.Command]]) -> None:
+        pages = await self.bot_help_pages(mapping)
+        source = menus.ListPageSource(pages, per_page=1)
         source.format_page = lambda menu, page: page
         await InfoPaginator(source, delete_message_after=True).start(self.context)
 
     async def send_cog_help(self, cog: commands.Cog):
         embed = discord.Embed(title=f"{cog.qualified_name} Commands", colour=self.COLOUR)
-        if cog.description:
-            embed.description = self.format_help(cog.description)
-
-        filtered = await self.filter_commands(cog.get_commands(), sort=True)
-        for command in filtered:
-            embed.add_field(
-                name=self.get_command_signature(command),
-                value=self.format_help(command.short_doc) or "...",
-                inline=False,
-            )
+        commands = cog.get_commands()
+        entries = self.cog_entries(cog, commands)
+        if entries.description:
+            embed.description = entries.description
+
+        self.add_command_fields(embed, entries, await self.filter_commands(commands, sort=True))
 
         embed.set_footer(text=self.get_ending_note())
         await self.get_destination().send(embed=embed)
@@ -63,13 +132,9 @@ class EmbedHelpCommand(commands.HelpCommand):
             embed.description = command.help.format(clean_prefix=self.context.clean_prefix)
 
         if isinstance(command, commands.Group):
-            filtered = await self.filter_commands(command.commands, sort=True)
-            for command in filtered:
-                embed.add_field(
-                    name=self.get_command_signature(command),
-                    value=self.format_help(command.short_doc) or "...",
-                    inline=False,
-                )
+            subcommands = list(command.commands)
+            entries = self.help_entries("group", command.qualified_name, None, subcommands)
+            self.add_command_fields(embed, entries, await self.filter_commands(subcommands, sort=True))
 
         embed.set_footer(text=self.get_ending_note())
         await self.get_destination().send(embed=embed)
@@ -81,9 +146,7 @@ class EmbedHelpCommand(commands.HelpCommand):
 
     async def command_not_found(self, string: str) -> None:
         ctx = self.context
-        command_names = [command.name for command in ctx.bot.commands]
-        close_commands = difflib.get_close_matches(string, command_names, n=2, cutoff=0.75)
-        joined = "\n".join(f"`{command}`" for command in close_commands)
+        joined = "\n".join(f"`{command}`" for command in ctx.bot.command_index.search(string))
 
         embed = discord.Embed(
             title="Error!",
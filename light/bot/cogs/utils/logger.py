@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import traceback
+from collections import deque
 from datetime import datetime
 from io import BytesIO
-from logging import CRITICAL, DEBUG, ERROR, INFO, WARNING, Logger, LogRecord
+from logging import CRITICAL, DEBUG, ERROR, INFO, WARNING, Handler, Logger, LogRecord
+from typing import Literal
 
 import discord
 
@@ -18,46 +20,100 @@ class WebhookLogger(Logger):
         DEBUG: discord.Colour.light_grey(),
     }
 
-    def __init__(self, webhook: discord.Webhook):
+    BATCH_SIZE = 10  # the most embeds a webhook message can have
+
+    def __init__(
+        self,
+        webhook: discord.Webhook,
+        *,
+        max_queue: int = 1_000,
+        max_delay: float = 10,
+        drop: Literal["oldest", "newest"] = "oldest",
+    ):
         super().__init__("light", level=DEBUG)
         self.webhook = webhook
-        self.queue = asyncio.Queue[LogRecord]()
+        self.max_queue = max_queue
+        self.max_delay = max_delay
+        self.drop = drop
+        self.queue: deque[LogRecord] = deque()
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._pending = asyncio.Event()  # set while there are records waiting
+        self._full = asyncio.Event()  # set while there is at least a full batch waiting
 
     def handle(self, record: LogRecord) -> None:
-        self.queue.put_nowait(record)
+        if len(self.queue) >= self.max_queue:
+            self.dropped += 1
+            if self.drop == "newest":
+                return
+            self.queue.popleft()
+
+        self.queue.append(record)
+        self._pending.set()
+        if len(self.queue) >= self.BATCH_SIZE:
+            self._full.set()
+
+    def create_message(self, records: list[LogRecord]) -> tuple[list[discord.Embed], list[discord.File]]:
+        embeds = []
+        files = []
+        for record in records:
+            description = "\n".join(
+                [
+                    f"```{'py' if record.exc_info else ''}",
+                    record.msg,
+                    *(traceback.format_exception(*record.exc_info) if record.exc_info else ()),
+                    "```",
+                ]
+            )
+            embed = discord.Embed(
+                title=f"logging.{record.levelname} emitted in `{record.pathname}`",
+                colour=self.COLOURS[record.levelno],
+                timestamp=datetime.utcfromtimestamp(record.created),
+            )
+            if len(description) <= 2048:
+                embed.description = description
+                embeds.append(embed)
+            else:
+                # too large to send as an embed description
+                error = "\n".join(traceback.format_exception(*record.exc_info) if record.exc_info else ())
+                files.append(discord.File(BytesIO(f"{record.msg}\n{error}".encode()), filename="error.py"))
+        return embeds, files
 
     async def sender(self) -> None:
+        """Ship records in batches of up to ``BATCH_SIZE`` once a batch is full or ``max_delay`` has passed.
+
+        Sends are serialised so the webhook adapter can honour the rate limit headers from the previous send.
+        """
         while True:
-            embeds = []
-            files = []
-            for record in [
-                r
-                for r in await asyncio.gather(
-                    *(asyncio.wait_for(self.queue.get(), timeout=10) for _ in range(10)),
-                    return_exceptions=True,
-                )
-                if isinstance(r, LogRecord)
-            ]:  # gather up to 10 embeds for sending
-                description = "\n".join(
-                    [
-                        f"```{'py' if record.exc_info else ''}",
-                        record.msg,
-                        *(traceback.format_exception(*record.exc_info) if record.exc_info else ()),
-                        "```",
-                    ]
-                )
-                embed = discord.Embed(
-                    title=f"logging.{record.levelname} emitted in `{record.pathname}`",
-                    colour=self.COLOURS[record.levelno],
-                    timestamp=datetime.utcfromtimestamp(record.created),
-                )
-                if len(description) <= 2048:
-                    embed.description = description
-                    embeds.append(embed)
-                else:
-                    # too large to send as an embed description
-                    error = "\n".join(traceback.format_exception(*record.exc_info) if record.exc_info else ())
-                    files.append(discord.File(BytesIO(f"{record.msg}\n{error}".encode()), filename="error.py"))
-
-            if embeds or files:
+            await self._pending.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+
+            records = [self.queue.popleft() for _ in range(min(self.BATCH_SIZE, len(self.queue)))]
+            if len(self.queue) < self.BATCH_SIZE:
+                self._full.clear()
+            if not self.queue:
+                self._pending.clear()
+
+            embeds, files = self.create_message(records)
+            try:
                 await self.webhook.send(embeds=embeds, files=files)
+            except Exception:  # logging this would just add it to the queue again
+                self.failed += len(records)
+                traceback.print_exc()
+            else:
+                self.sent += len(records)
+
+
+class WebhookHandler(Handler):
+    """Forwards records from a standard library logger to a :class:`WebhookLogger`."""
+
+    def __init__(self, logger: WebhookLogger, level: int = WARNING):
+        super().__init__(level)
+        self.logger = logger
+
+    def emit(self, record: LogRecord) -> None:
+        self.logger.handle(record)
@@ -0,0 +1,87 @@
+"""How much of discord.py's cache the bot keeps, and rough measurements of how much memory the caches use."""
+
+from __future__ import annotations
+
+import dataclasses
+import random
+import sys
+from collections.abc import Collection, Mapping
+from types import FunctionType, MethodType, ModuleType
+from typing import Any
+
+import discord
+
+SAMPLE_SIZE = 100  #: Containers bigger than this are measured from a random sample and scaled up
+MAX_DEPTH = 8
+ATOMIC = (str, bytes, int, float, complex, bool, type(None))
+SKIPPED = (type, ModuleType, FunctionType, MethodType, discord.Client)
+SKIPPED_ATTRIBUTES = {"_state", "_bot", "bot", "_client", "client", "http", "_http", "loop", "_loop"}  # shared state
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheProfile:
+    intents: discord.Intents
+    max_messages: int | None  #: The number of messages to keep, ``None`` disables the message cache
+    member_cache_flags: discord.MemberCacheFlags
+    chunk_guilds_at_startup: bool
+
+    def options(self) -> dict[str, Any]:
+        """The keyword arguments to pass to :class:`discord.Client`."""
+        return {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+
+
+def minimal() -> CacheProfile:
+    # enough for prefix commands, reaction menus and the steam emojis, members are only known from their messages
+    intents = discord.Intents(
+        guilds=True, emojis=True, guild_messages=True, dm_messages=True, guild_reactions=True, dm_reactions=True
+    )
+    return CacheProfile(intents, 100, discord.MemberCacheFlags.none(), chunk_guilds_at_startup=False)
+
+
+def default() -> CacheProfile:
+    intents = discord.Intents.default()
+    return CacheProfile(intents, 1000, discord.MemberCacheFlags.from_intents(intents), intents.members)
+
+
+def full() -> CacheProfile:
+    intents = discord.Intents.all()
+    return CacheProfile(intents, 5000, discord.MemberCacheFlags.all(), chunk_guilds_at_startup=True)
+
+
+PROFILES = {"minimal": minimal, "default": default, "full": full}
+
+
+def sizeof(obj: Any, *, seen: set[int] | None = None, depth: int = 0) -> int:
+    """Approximately how many bytes ``obj`` and everything it references take up.
+
+    Objects are only counted once per call and references to the client's shared state aren't followed.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen or isinstance(obj, SKIPPED):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, ATOMIC) or depth >= MAX_DEPTH:
+        return size
+
+    if isinstance(obj, Mapping):
+        size += sizeof_many(list(obj.items()), seen, depth)
+    elif isinstance(obj, Collection):
+        size += sizeof_many(list(obj), seen, depth)
+
+    attributes = [
+        getattr(obj, name)
+        for cls in type(obj).__mro__
+        for name in getattr(cls, "__slots__", ())
+        if name not in SKIPPED_ATTRIBUTES and hasattr(obj, name)
+    ]
+    if hasattr(obj, "__dict__"):
+        attributes.append({name: value for name, value in vars(obj).items() if name not in SKIPPED_ATTRIBUTES})
+    return size + sum(sizeof(attribute, seen=seen, depth=depth + 1) for attribute in attributes)
+
+
+def sizeof_many(items: list[Any], seen: set[int], depth: int) -> int:
+    if len(items) <= SAMPLE_SIZE:
+        return sum(sizeof(item, seen=seen, depth=depth + 1) for item in items)
+    sample = random.sample(items, SAMPLE_SIZE)
+    return sum(sizeof(item, seen=seen, depth=depth + 1) for item in sample) * len(items) // SAMPLE_SIZE
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import time
+from typing import Any
+
+import aiohttp
+from yarl import URL
+
+
+@dataclasses.dataclass
+class Endpoint:
+    """An HTTP endpoint that is polled for JSON, along with the validators and stats from the last poll."""
+
+    url: URL
+    etag: str | None = None
+    last_modified: str | None = None
+    data: Any = None  #: The last successfully parsed payload
+    latency: float | None = None  #: How long the last poll took in seconds
+    polls: int = 0
+    failures: int = 0  #: The total number of failed polls
+    consecutive_failures: int = 0
+    retry_at: float = 0  #: The monotonic time before which the endpoint is backing off
+
+
+class Poller:
+    """Polls JSON endpoints with a timeout, conditional requests and exponential backoff.
+
+    A payload that hasn't changed since the last poll (HTTP 304) isn't parsed again; the previous one is returned.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        *,
+        timeout: float = 10,
+        backoff: float = 60,
+        max_backoff: float = 30 * 60,
+    ) -> None:
+        self.session = session
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.endpoints: dict[str, Endpoint] = {}
+
+    def add(self, name: str, url: URL) -> Endpoint:
+        endpoint = self.endpoints.get(name)
+        if endpoint is None or endpoint.url != url:
+            endpoint = self.endpoints[name] = Endpoint(url)
+        return endpoint
+
+    async def poll(self, endpoint: Endpoint) -> Any:
+        """Fetch an endpoint's payload, returns ``None`` if the poll failed or the endpoint is backing off."""
+        if time.monotonic() < endpoint.retry_at:
+            return None
+
+        headers = {}
+        if endpoint.etag:
+            headers["If-None-Match"] = endpoint.etag
+        if endpoint.last_modified:
+            headers["If-Modified-Since"] = endpoint.last_modified
+
+        endpoint.polls += 1
+        start = time.perf_counter()
+        try:
+            async with self.session.get(endpoint.url, headers=headers, timeout=self.timeout) as resp:
+                if resp.status == 304 and endpoint.data is not None:
+                    data = endpoint.data
+                else:
+                    resp.raise_for_status()
+                    data = await resp.json(content_type=None)
+                    endpoint.etag = resp.headers.get("ETag")
+                    endpoint.last_modified = resp.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            delay = min(self.backoff * 2 ** (endpoint.consecutive_failures - 1), self.max_backoff)
+            endpoint.retry_at = time.monotonic() + delay
+            return None
+        finally:
+            endpoint.latency = time.perf_counter() - start
+
+        endpoint.consecutive_failures = 0
+        endpoint.data = data
+        return data
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+
+class PrefixMatcher:
+    """A guild's prefixes and the bot's mentions, sorted longest first so the first match is the best match."""
+
+    __slots__ = ("prefixes",)
+
+    def __init__(self, user_id: int, prefixes: Iterable[str]) -> None:
+        self.prefixes = tuple(sorted({f"<@{user_id}> ", f"<@!{user_id}> ", *prefixes}, key=len, reverse=True))
+
+    def __repr__(self) -> str:
+        return f"<PrefixMatcher prefixes={self.prefixes!r}>"
+
+    def match(self, content: str) -> str | None:
+        if content.startswith(self.prefixes):  # most messages aren't commands so reject them in one C call
+            for prefix in self.prefixes:
+                if content.startswith(prefix):
+                    return prefix
+        return None
@@ -0,0 +1,133 @@
+"""Query timing and pool statistics.
+
+Every query run on a :class:`TimedConnection` is timed and bucketed by its statement text, and anything slower than
+``SLOW_QUERY_THRESHOLD`` is logged to ``light.db``. :class:`TimedPool` wraps the asyncpg pool (which has ``__slots__``
+so can't be subclassed in place) to time how long acquiring a connection takes.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+import asyncpg
+
+from .. import metrics
+
+log = logging.getLogger("light.db")
+
+SLOW_QUERY_THRESHOLD = 0.5
+
+QUERY_LATENCY = metrics.Histogram("light_db_query_seconds", "Time taken to run a query", ["statement"])
+ACQUIRE_LATENCY = metrics.Histogram("light_db_acquire_seconds", "Time spent waiting for a pool connection")
+
+
+def normalise(query: str) -> str:
+    return " ".join(query.split())
+
+
+class TimedConnection(asyncpg.Connection):
+    async def _timed(self, method: str, query: str, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await getattr(super(), method)(query, *args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            statement = normalise(query)
+            QUERY_LATENCY.observe(duration, statement)
+            if duration >= SLOW_QUERY_THRESHOLD:
+                log.warning(f"Slow query took {duration:.3f}s: {statement}")
+
+    async def execute(self, query: str, *args: Any, **kwargs: Any) -> str:
+        return await self._timed("execute", query, *args, **kwargs)
+
+    async def executemany(self, command: str, args: Any, **kwargs: Any) -> None:
+        return await self._timed("executemany", command, args, **kwargs)
+
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> list[asyncpg.Record]:
+        return await self._timed("fetch", query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args: Any, **kwargs: Any) -> asyncpg.Record | None:
+        return await self._timed("fetchrow", query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        return await self._timed("fetchval", query, *args, **kwargs)
+
+
+class _TimedAcquireContext:
+    __slots__ = ("pool", "timeout", "connection")
+
+    def __init__(self, pool: TimedPool, timeout: float | None) -> None:
+        self.pool = pool
+        self.timeout = timeout
+        self.connection: asyncpg.Connection | None = None
+
+    async def _acquire(self) -> asyncpg.Connection:
+        self.pool.waiters += 1
+        start = time.perf_counter()
+        try:
+            return await self.pool.pool.acquire(timeout=self.timeout)
+        finally:
+            self.pool.waiters -= 1
+            ACQUIRE_LATENCY.observe(time.perf_counter() - start)
+
+    def __await__(self):
+        return self._acquire().__await__()
+
+    async def __aenter__(self) -> asyncpg.Connection:
+        self.connection = await self._acquire()
+        return self.connection
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.pool.pool.release(self.connection)
+
+
+class TimedPool:
+    """A proxy for :class:`asyncpg.Pool` that keeps track of how long callers wait for a connection."""
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self.pool = pool
+        self.waiters = 0
+        metrics.Gauge(
+            "light_db_pool_connections",
+            "Connections in the database pool",
+            ["state"],
+            callback=lambda: {(state,): value for state, value in self.stats().items()},
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool, name)
+
+    def acquire(self, *, timeout: float | None = None) -> _TimedAcquireContext:
+        return _TimedAcquireContext(self, timeout)
+
+    async def execute(self, query: str, *args: Any, **kwargs: Any) -> str:
+        async with self.acquire() as connection:
+            return await connection.execute(query, *args, **kwargs)
+
+    async def executemany(self, command: str, args: Any, **kwargs: Any) -> None:
+        async with self.acquire() as connection:
+            return await connection.executemany(command, args, **kwargs)
+
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> list[asyncpg.Record]:
+        async with self.acquire() as connection:
+            return await connection.fetch(query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args: Any, **kwargs: Any) -> asyncpg.Record | None:
+        async with self.acquire() as connection:
+            return await connection.fetchrow(query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        async with self.acquire() as connection:
+            return await connection.fetchval(query, *args, **kwargs)
+
+    def stats(self) -> dict[str, int]:
+        size = self.pool.get_size()
+        return {
+            "size": size,
+            "max": self.pool.get_max_size(),
+            "idle": self.pool.get_idle_size(),
+            "in_use": size - self.pool.get_idle_size(),
+            "waiters": self.waiters,
+        }
@@ -0,0 +1,118 @@
+"""Downsampling and pruning for the SteamService time series.
+
+Raw minute rows are kept for ``RAW_RETENTION``, then rolled up into hourly buckets. Hourly buckets are kept for
+``HOURLY_RETENTION``, then rolled up into daily buckets which are kept forever. Failed polls are stored as ``-1`` so
+they are excluded from the aggregates, and each metric keeps its own sample count because the endpoints they come from
+fail independently.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+
+from . import SteamService, SteamServiceRollup
+
+RAW_RETENTION = timedelta(days=2)
+HOURLY_RETENTION = timedelta(days=90)
+
+ROLLUP_RAW = f"""
+WITH pruned AS (
+    DELETE FROM {SteamService._name} WHERE created_at < $1 RETURNING *
+)
+INSERT INTO {SteamServiceRollup._name}
+SELECT
+    'hour',
+    date_trunc('hour', created_at),
+    count(*) FILTER (WHERE percent_up >= 0),
+    min(percent_up) FILTER (WHERE percent_up >= 0),
+    avg(percent_up) FILTER (WHERE percent_up >= 0),
+    max(percent_up) FILTER (WHERE percent_up >= 0),
+    count(*) FILTER (WHERE online_count >= 0),
+    min(online_count) FILTER (WHERE online_count >= 0),
+    avg(online_count) FILTER (WHERE online_count >= 0),
+    max(online_count) FILTER (WHERE online_count >= 0)
+FROM pruned
+GROUP BY 2
+ON CONFLICT (resolution, bucket) DO NOTHING
+"""
+
+ROLLUP_HOURLY = f"""
+WITH pruned AS (
+    DELETE FROM {SteamServiceRollup._name} WHERE resolution = 'hour' AND bucket < $1 RETURNING *
+)
+INSERT INTO {SteamServiceRollup._name}
+SELECT
+    'day',
+    date_trunc('day', bucket),
+    sum(percent_up_samples),
+    min(percent_up_min),
+    sum(percent_up_avg * percent_up_samples) / nullif(sum(percent_up_samples), 0),
+    max(percent_up_max),
+    sum(online_count_samples),
+    min(online_count_min),
+    sum(online_count_avg * online_count_samples) / nullif(sum(online_count_samples), 0),
+    max(online_count_max)
+FROM pruned
+GROUP BY 2
+ON CONFLICT (resolution, bucket) DO NOTHING
+"""
+
+HISTORY = f"""
+SELECT
+    date_trunc($2, at) AS created_at,
+    sum(percent_up * percent_up_samples) / nullif(sum(percent_up_samples), 0) AS percent_up,
+    sum(online_count * online_count_samples) / nullif(sum(online_count_samples), 0) AS online_count
+FROM (
+    SELECT bucket, percent_up_samples, percent_up_avg, online_count_samples, online_count_avg
+    FROM {SteamServiceRollup._name}
+    WHERE bucket >= $1
+    UNION ALL
+    SELECT
+        created_at,
+        (percent_up >= 0)::int, nullif(percent_up, -1),
+        (online_count >= 0)::int, nullif(online_count, -1)
+    FROM {SteamService._name}
+    WHERE created_at >= $1
+) AS points (at, percent_up_samples, percent_up, online_count_samples, online_count)
+GROUP BY 1
+ORDER BY 1
+"""
+
+
+async def rollup(db: asyncpg.Pool, now: datetime | None = None) -> None:
+    """Roll up and prune everything that has aged out of its tier.
+
+    Cutoffs are truncated to whole buckets so each bucket is only ever aggregated once.
+    """
+    now = now or datetime.now(timezone.utc)
+    raw_cutoff = (now - RAW_RETENTION).replace(minute=0, second=0, microsecond=0)
+    hourly_cutoff = (now - HOURLY_RETENTION).replace(hour=0, minute=0, second=0, microsecond=0)
+    async with db.acquire() as connection, connection.transaction():
+        await connection.execute(ROLLUP_RAW, raw_cutoff)
+        await connection.execute(ROLLUP_HOURLY, hourly_cutoff)
+
+
+def resolution_for(window: timedelta) -> str:
+    """The coarsest resolution that still gives a useful number of points for ``window``."""
+    if window <= timedelta(days=1):
+        return "minute"
+    if window <= timedelta(days=30):
+        return "hour"
+    return "day"
+
+
+async def fetch_history(db: asyncpg.Pool, since: datetime, now: datetime | None = None) -> list[asyncpg.Record]:
+    """Fetch the average ``percent_up`` and ``online_count`` from ``since`` until now.
+
+    Raw rows and rollups are merged so windows that span several tiers don't have gaps.
+    """
+    now = now or datetime.now(timezone.utc)
+    resolution = resolution_for(now - since)
+    since = since.replace(second=0, microsecond=0)
+    if resolution != "minute":
+        since = since.replace(minute=0)
+    if resolution == "day":
+        since = since.replace(hour=0)
+    return await db.fetch(HISTORY, since, resolution)
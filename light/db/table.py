@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import sys
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Hashable, Iterable
 from typing import TYPE_CHECKING, Any, Optional, TypeVar
 
 from asyncpg import Record
@@ -10,6 +10,25 @@ from donphan._selectable import OrderBy
 
 T = TypeVar("T", bound="Table")
 
+MAX_CACHED_QUERIES = 1024
+QUERY_CACHE: dict[Hashable, str] = {}
+
+
+def signature(value: Any) -> Hashable:
+    """Reduce an argument to one of donphan's query builders to the parts that affect the generated SQL."""
+    if value is None or isinstance(value, (str, int)):
+        return value
+    if isinstance(value, Column):
+        return value.name
+    return tuple(v if isinstance(v, str) else v.name for v in value)  # columns or an ORDER BY tuple
+
+
+def cache_query(key: Hashable, query: str) -> str:
+    if len(QUERY_CACHE) >= MAX_CACHED_QUERIES:  # only hand written WHERE clauses can make this grow unbounded
+        QUERY_CACHE.clear()
+    QUERY_CACHE[key] = query
+    return query
+
 
 class DotRecord(Record):
     """Provide dot access to Records."""
@@ -40,6 +59,44 @@ class Table(DonphanTable):
 
         super().__init_subclass__()
 
+    # donphan rebuilds the SQL for every call, cache it by (table, builder, column names) instead. asyncpg already keeps
+    # a prepared statement per connection for each distinct query string, so stable strings also mean those get reused.
+
+    @classmethod
+    def _cached_query(cls, builder: str, *args: Any) -> str:
+        key = (cls, builder, *map(signature, args))
+        try:
+            return QUERY_CACHE[key]
+        except KeyError:
+            return cache_query(key, getattr(super(), builder)(*args))
+
+    @classmethod
+    def _build_where_clause(cls, values: dict[str, Any]) -> str:
+        # only the column names and whether a value is NULL change the clause
+        key = (cls, *values, *(value is None for value in values.values()))
+        try:
+            return QUERY_CACHE[key]
+        except KeyError:
+            return cache_query(key, super()._build_where_clause(values))
+
+    @classmethod
+    def _build_query_fetch(cls, where: str, limit: Optional[int], order_by: OrderBy | str | None) -> str:
+        return cls._cached_query("_build_query_fetch", where, limit, order_by)
+
+    @classmethod
+    def _build_query_insert(
+        cls, columns: Any, ignore_on_conflict: bool, update_on_conflict: Any, returning: Any
+    ) -> str:
+        return cls._cached_query("_build_query_insert", columns, ignore_on_conflict, update_on_conflict, returning)
+
+    @classmethod
+    def _build_query_update(cls, where: str, offset: int, columns: Any, returning: Any) -> str:
+        return cls._cached_query("_build_query_update", where, offset, columns, returning)
+
+    @classmethod
+    def _build_query_delete(cls, where: str, returning: Any) -> str:
+        return cls._cached_query("_build_query_delete", where, returning)
+
     if TYPE_CHECKING:
 
         @classmethod
@@ -0,0 +1,62 @@
+"""The HTTP client shared by the bot, the web app and the background pollers.
+
+Requests made through it are counted and timed per host, see ``light_http_requests_total`` and
+``light_http_request_seconds`` on ``/metrics``.
+"""
+
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import aiohttp
+
+from . import metrics
+
+LIMIT = 100  #: The total number of connections that can be open at once
+LIMIT_PER_HOST = 20  #: So one slow host can't starve the others, discord and steam are hit the most
+DNS_CACHE_TTL = 5 * 60
+KEEPALIVE_TIMEOUT = 30  #: The status pollers hit the same hosts every minute, so keep their connections around
+TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10)
+
+REQUESTS = metrics.Counter("light_http_requests_total", "HTTP requests made by the shared client", ["host", "status"])
+REQUEST_LATENCY = metrics.Histogram("light_http_request_seconds", "Time taken for HTTP requests to complete", ["host"])
+
+
+async def on_request_start(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestStartParams
+) -> None:
+    context.start = time.perf_counter()
+
+
+async def on_request_end(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestEndParams
+) -> None:
+    observe(context, params.url.host, str(params.response.status))
+
+
+async def on_request_exception(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: aiohttp.TraceRequestExceptionParams
+) -> None:
+    observe(context, params.url.host, type(params.exception).__name__)
+
+
+def observe(context: SimpleNamespace, host: str | None, status: str) -> None:
+    host = host or ""
+    REQUESTS.inc(host, status)
+    REQUEST_LATENCY.observe(time.perf_counter() - context.start, host)
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create the tuned, instrumented session. It has to be created inside a running event loop."""
+    connector = aiohttp.TCPConnector(
+        limit=LIMIT,
+        limit_per_host=LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return aiohttp.ClientSession(connector=connector, timeout=TIMEOUT, trace_configs=[trace_config])
@@ -0,0 +1,122 @@
+"""Minimal Prometheus style metrics, rendered in the text exposition format for the web app's ``/metrics`` route."""
+
+from __future__ import annotations
+
+import abc
+import bisect
+import contextlib
+import time
+from collections.abc import Callable, Iterator, Sequence
+from typing import ClassVar
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Metric(abc.ABC):
+    type: ClassVar[str]
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), *, registry: Registry | None = None):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        (registry or REGISTRY).register(self)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name={self.name!r}>"
+
+    @abc.abstractmethod
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines += [f"{name}{format_labels(labels)} {value}" for name, labels, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for labels, value in self.values.items():
+            yield self.name, dict(zip(self.labels, labels)), value
+
+
+class Gauge(Metric):
+    """A metric whose values are read from ``callback`` at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, *args, callback: Callable[[], dict[tuple[str, ...], float]], **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.callback = callback
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for labels, value in self.callback().items():
+            yield self.name, dict(zip(self.labels, labels)), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        self.values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}  # bucket counts, [sum]
+
+    def observe(self, value: float, *labels: str) -> None:
+        try:
+            counts, total = self.values[labels]
+        except KeyError:
+            counts, total = self.values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    @contextlib.contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for labels, (counts, total) in self.values.items():
+            labels = dict(zip(self.labels, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", labels | {"le": str(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        self.metrics[metric.name] = metric  # replace rather than raise so reloading an extension works
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
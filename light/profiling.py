@@ -0,0 +1,57 @@
+"""Where the time goes while the bot starts up.
+
+Stages are recorded with :meth:`StartupProfiler.time` from anywhere in the package and :meth:`StartupProfiler.report`
+formats them slowest first. Stages can overlap (imports run concurrently), so they won't add up to the total.
+
+Milestones such as each service becoming ready or the first command that needed it are recorded with
+:meth:`StartupProfiler.mark` as the time since the process started, and are exported as ``light_startup_seconds``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from collections.abc import Iterator
+
+from . import metrics
+
+
+class StartupProfiler:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.timings: dict[str, float] = {}
+        self.milestones: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = time.perf_counter() - start
+
+    def mark(self, milestone: str) -> bool:
+        """Record the first time a milestone is reached, returns whether this was the first time."""
+        if milestone in self.milestones:
+            return False
+        self.milestones[milestone] = time.perf_counter() - self.started
+        return True
+
+    def report(self) -> str:
+        width = max(map(len, self.timings), default=0)
+        lines = [
+            f"{stage:<{width}}  {duration * 1000:8.1f}ms"
+            for stage, duration in sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        ]
+        lines.append(f"{'total':<{width}}  {(time.perf_counter() - self.started) * 1000:8.1f}ms")
+        return "\n".join(lines)
+
+
+STARTUP = StartupProfiler()
+
+metrics.Gauge(
+    "light_startup_seconds",
+    "Seconds from startup until each milestone was first reached",
+    ["milestone"],
+    callback=lambda: {(milestone,): seconds for milestone, seconds in STARTUP.milestones.items()},
+)
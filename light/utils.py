@@ -1,7 +1,17 @@
+from __future__ import annotations
+
+import asyncio
 import contextlib
-from typing import Any, Protocol, TypeVar
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, Protocol, TypeVar
 
 C = TypeVar("C", bound="Closeable")
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+MISSING: Any = object()
 
 
 class Closeable(Protocol):
@@ -15,3 +25,122 @@ async def aclosing(value: C) -> C:
         yield value
     finally:
         await value.close()
+
+
+class TTLCache(Generic[K, V]):
+    """A bounded LRU cache whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"<TTLCache size={len(self)}/{self.maxsize} hits={self.hits} misses={self.misses}>"
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self.set(key, value)
+
+    def set(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        """Set an entry that expires after ``ttl`` seconds instead of the cache's default."""
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        try:
+            expires, value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        if expires < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def pop(self, key: K, default: Any = None) -> V | Any:
+        try:
+            return self._data.pop(key)[1]
+        except KeyError:
+            return default
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesces concurrent calls for the same key into one call and caches successful results for ``ttl`` seconds.
+
+    ``ttl_for`` can give a result its own ttl, returning ``None`` uses ``ttl``. Waiters are shielded from each other, so
+    cancelling one caller doesn't cancel the shared call.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, *, ttl_for: Callable[[V], float | None] | None = None) -> None:
+        self.cache: TTLCache[K, V] = TTLCache(maxsize, ttl)
+        self.ttl_for = ttl_for
+        self._in_flight: dict[K, asyncio.Task[V]] = {}
+
+    def __repr__(self) -> str:
+        return f"<SingleFlight in_flight={len(self._in_flight)} cache={self.cache!r}>"
+
+    async def fetch(self, key: K, func: Callable[..., Awaitable[V]], *args: Any) -> V:
+        value = self.cache.get(key, MISSING)
+        if value is not MISSING:
+            return value
+
+        return await asyncio.shield(self._start(key, func, *args))
+
+    def _start(self, key: K, func: Callable[..., Awaitable[V]], *args: Any) -> asyncio.Task[V]:
+        try:
+            return self._in_flight[key]
+        except KeyError:
+            task = self._in_flight[key] = asyncio.create_task(func(*args))
+            task.add_done_callback(lambda task: self._done(key, task))
+            return task
+
+    def _done(self, key: K, task: asyncio.Task[V]) -> None:
+        del self._in_flight[key]
+        if not task.cancelled() and task.exception() is None:
+            result = task.result()
+            self.cache.set(key, result, ttl=self.ttl_for(result) if self.ttl_for is not None else None)
+
+
+class StaleWhileRevalidate(SingleFlight[K, tuple[float, V]]):
+    """A :class:`SingleFlight` that answers from the cache for up to ``max_age`` seconds.
+
+    Entries older than ``ttl`` are still returned, but a refresh is started in the background so the next caller gets
+    a fresh one. If the refresh fails the stale entry is kept until it reaches ``max_age``.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_age: float) -> None:
+        super().__init__(maxsize, max_age)
+        self.ttl = ttl
+        self.refreshes = 0
+
+    async def fetch(self, key: K, func: Callable[..., Awaitable[V]], *args: Any) -> V:
+        entry = self.cache.get(key, MISSING)
+        if entry is MISSING:
+            entry = await asyncio.shield(self._start(key, self._timed, func, *args))
+        elif time.monotonic() - entry[0] > self.ttl and key not in self._in_flight:
+            self.refreshes += 1
+            self._start(key, self._timed, func, *args)
+        return entry[1]
+
+    @staticmethod
+    async def _timed(func: Callable[..., Awaitable[V]], *args: Any) -> tuple[float, V]:
+        return time.monotonic(), await func(*args)
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 import asyncio
-import contextlib
 import dataclasses
 import datetime
 import inspect
 import secrets
 import uuid
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Protocol
 
 import aiohttp
@@ -15,12 +15,16 @@ import jinja2
 from asyncpg import Pool
 from discord import http
 from fastapi import FastAPI
-from fastapi.responses import HTMLResponse, RedirectResponse
-from starlette.background import BackgroundTask
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse
 
+from light import config
 from light.db import SteamUser
+from light.metrics import REGISTRY
+from light.utils import TTLCache
 
 from .router import Request, Route, route
+from .sessions import PendingRegistration, Session, SessionStore
+from .tokens import TokenRefresher
 from .types import AccessTokenExchange, AccessTokenResponse, Connection, PartialUser
 
 if TYPE_CHECKING:
@@ -30,37 +34,71 @@ app: App
 
 
 class App(FastAPI):
-    def __init__(self, db: Pool, bot: Light, **extra: Any):
+    def __init__(self, db: Pool, bot: Light, session: aiohttp.ClientSession, **extra: Any):
         super().__init__(**extra)
         self.routes.clear()  # don't want docs etc.
         self.router.route_class = Route
         self.db = db
         self.bot = bot
-        self.session = aiohttp.ClientSession()
+        self.session = session  # owned by the bot, which closes it
+        self.sessions = SessionStore(bot)
+        self.pending_registrations: TTLCache[uuid.UUID, PendingRegistration] = TTLCache(maxsize=1_000, ttl=10 * 60)
+        cache_dir = Path(config.TEMPLATE_CACHE_DIR)
+        cache_dir.mkdir(exist_ok=True)
         self.env = jinja2.Environment(
             loader=jinja2.PackageLoader("web"),
             enable_async=True,
+            bytecode_cache=jinja2.FileSystemBytecodeCache(str(cache_dir)),
         )
+        # compile everything up front, anything unchanged since the last run is loaded from the bytecode cache
+        for name in self.env.list_templates(extensions=["j2"]):
+            self.env.get_template(name)
+        self.anonymous_responses: dict[str, tuple[jinja2.Template, str]] = {}
+        self.token_refresher: TokenRefresher | None = None
+        self.token_refresher_task: asyncio.Task[None] | None = None
+        self.add_event_handler("startup", self.start_token_refresher)
         for _, route in inspect.getmembers(self, predicate=lambda r: hasattr(r, "path")):
             getattr(self, route.method.lower())(route.path)(route)
 
     async def close(self) -> None:
-        await self.session.close()
+        if self.token_refresher_task is not None:
+            self.token_refresher_task.cancel()
+
+    async def start_token_refresher(self) -> None:
+        self.token_refresher_task = asyncio.create_task(self.refresh_tokens())
+
+    async def refresh_tokens(self) -> None:
+        await self.bot.wait_until_ready()  # the client id is the bot's id
+        self.token_refresher = TokenRefresher(self.db, self.session, str(self.bot.user.id), self.bot.client_secret)
+        await self.token_refresher.run(config.TOKEN_REFRESH_INTERVAL)
 
     @route.get / ""  # fmt: skip
     async def index(self, request: Request):
-        user = None
-        if session_id := request.cookies.get("session_id"):
-            session_id = uuid.UUID(session_id)
-            record = await SteamUser.fetch_row(session_id=session_id)
-            # if discord.utils.utcnow() > record.expires:
-            #     asyncio.create_task(self.refresh_token(session_id))
-            with contextlib.suppress(discord.HTTPException):
-                user = self.bot.get_user(record.id) or await self.bot.fetch_user(record.id)
+        user = await self.get_session(request)
+        if user is None:
+            return HTMLResponse(await self.render_anonymous(request.template))
         content = await request.template.render_async(user=user)
 
         return HTMLResponse(content)
 
+    async def render_anonymous(self, template: jinja2.Template) -> str:
+        """Render a template for a logged out user, reusing the last render until the template is reloaded."""
+        # the environment hands back a new Template object whenever the source changes on disk
+        cached = self.anonymous_responses.get(template.name)
+        if cached is None or cached[0] is not template:
+            cached = self.anonymous_responses[template.name] = (template, await template.render_async(user=None))
+        return cached[1]
+
+    def session_id(self, request: Request) -> uuid.UUID | None:
+        try:
+            return uuid.UUID(request.cookies["session_id"])
+        except (KeyError, ValueError):
+            return None
+
+    async def get_session(self, request: Request) -> Session | None:
+        session_id = self.session_id(request)
+        return await self.sessions.get(session_id) if session_id is not None else None
+
     @route.get / "login"  # fmt: skip
     async def login(self, request: Request):
         state = secrets.token_urlsafe(20)
@@ -111,23 +149,7 @@ class App(FastAPI):
             "session_id": session_id,
         }
 
-        if len(connections) != 1:  # let them pick which account they want to register
-            routes = self.routes.copy()
-            event = asyncio.Event()
-
-            # is this utter garbage?
-            @self.post(f"/register/{session_id}")
-            async def wait_for_post(request: Request):
-                assert request.cookies["session_id"] == str(session_id)
-                form = await request.form()
-                id64 = int(form["user"])
-                assert id64 in [user.id64 for user in users]
-                await SteamUser.insert(id64=id64, **kwargs)
-                event.set()
-                self.routes.remove(route)
-                return request.home
-
-            route = [r for r in self.routes if r not in routes][0]
+        if len(connections) != 1:  # let them pick which account they want to register, see register
             users: list[PartialUser] = [
                 # await self.bot.client.fetch_user(connection["id"]) or
                 PrivateUser(
@@ -136,50 +158,57 @@ class App(FastAPI):
                 )
                 for connection in connections
             ]
-            resp = HTMLResponse(
-                await request.template.render_async(session_id=session_id, users=users),
-                background=BackgroundTask(event.wait),
+            self.pending_registrations[session_id] = PendingRegistration(
+                user["username"], [user.id64 for user in users], kwargs
             )
+            resp = HTMLResponse(await request.template.render_async(users=users))
         else:
             await SteamUser.insert(id64=int(connections[0]["id"]), **kwargs)
+            self.bot.linked_accounts.pop(kwargs["id"])
+            self.sessions.add(Session(session_id, kwargs["id"], int(connections[0]["id"]), user["username"]))
             resp = request.home
         resp.set_cookie("session_id", str(session_id))
         return resp
 
+    @route.post / "register"  # fmt: skip
+    async def register(self, request: Request):
+        session_id = self.session_id(request)
+        pending = self.pending_registrations.get(session_id)
+        if pending is None:  # expired, evicted or already registered
+            return request.home
+
+        form = await request.form()
+        id64 = int(form["user"])
+        if id64 not in pending.id64s:
+            return request.home
+
+        self.pending_registrations.pop(session_id)
+        await SteamUser.insert(id64=id64, **pending.columns)
+        self.bot.linked_accounts.pop(pending.columns["id"])
+        self.sessions.add(Session(session_id, pending.columns["id"], id64, pending.name))
+        return request.home
+
     @route.get / "logout"  # fmt: skip
     async def logout(self, request: Request):
-        session_id = request.cookies.get("session_id")
         resp = request.home
-        if session_id:
-            await SteamUser.delete(session_id=session_id)
-            resp.delete_cookie("session_id")
+        if session := await self.get_session(request):
+            await SteamUser.delete(session_id=session.id)
+            self.sessions.invalidate(session.id)
+            self.bot.linked_accounts.pop(session.user_id)
+        resp.delete_cookie("session_id")
         return resp
 
+    @route.get / "metrics"  # fmt: skip
+    async def metrics(self, request: Request):
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
     # TODO: profile route to select your default steam account again? or should that be on discord once we have a token?
     # maybe both?
 
-    async def refresh_token(self, session_id: uuid.UUID) -> str:
-        record = await SteamUser.fetch_row(sesion_id=session_id)
-        data = {
-            "client_id": self.bot.user.id,
-            "client_secret": self.bot.client_secret,
-            "grant_type": "refresh_token",
-            "refresh_token": record.refresh_token,
-        }
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        resp = await self.session.post(f"{http.Route.BASE}/oauth2/token", data=data, headers=headers)
-        data: AccessTokenResponse = await resp.json()
-
-        record.access_token = data["access_token"]
-        record.refresh_token = data["refresh_token"]
-        record.expires = discord.utils.utcnow() + datetime.timedelta(seconds=data["expires_in"])
-
-        await SteamUser.update_record(record)  # type: ignore
-
 
-async def setup(db: Pool, bot: Light) -> App:
+async def setup(db: Pool, bot: Light, session: aiohttp.ClientSession) -> App:
     global app
-    app = App(db, bot)
+    app = App(db, bot, session)
     return app
 
 
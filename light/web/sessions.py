@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import uuid
+from typing import TYPE_CHECKING, Any
+
+import discord
+
+from light.db import SteamUser
+from light.utils import MISSING, TTLCache
+
+if TYPE_CHECKING:
+    from ..bot import Light
+
+
+@dataclasses.dataclass
+class Session:
+    id: uuid.UUID
+    user_id: int
+    id64: int
+    name: str  #: The discord user's name, so pages can be rendered without asking discord for it
+
+
+@dataclasses.dataclass
+class PendingRegistration:
+    """A login for a user with more than one steam connection that is waiting for them to pick an account."""
+
+    name: str
+    id64s: list[int]
+    columns: dict[str, Any]  #: The :class:`SteamUser` columns to insert once an account has been picked
+
+
+class SessionStore:
+    """An in-memory cache of dashboard sessions in front of the :class:`SteamUser` table.
+
+    Sessions are added as soon as a login completes, so a normal page view never needs to hit the database or discord.
+    Unknown session ids are cached as ``None``.
+    """
+
+    def __init__(self, bot: Light, *, maxsize: int = 10_000, ttl: float = 30 * 60) -> None:
+        self.bot = bot
+        self.cache: TTLCache[uuid.UUID, Session | None] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def add(self, session: Session) -> None:
+        self.cache[session.id] = session
+
+    def invalidate(self, session_id: uuid.UUID) -> None:
+        self.cache.pop(session_id)
+
+    async def get(self, session_id: uuid.UUID) -> Session | None:
+        session = self.cache.get(session_id, MISSING)
+        if session is MISSING:
+            session = self.cache[session_id] = await self.fetch(session_id)
+        return session
+
+    async def fetch(self, session_id: uuid.UUID) -> Session | None:
+        record = await SteamUser.fetch_row(session_id=session_id)
+        if record is None:
+            return None
+
+        user = self.bot.get_user(record.id)
+        if user is None:
+            with contextlib.suppress(discord.HTTPException):
+                user = await self.bot.fetch_user(record.id)
+        return Session(
+            id=session_id,
+            user_id=record.id,
+            id64=record.id64,
+            name=user.name if user is not None else str(record.id),
+        )
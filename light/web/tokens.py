@@ -0,0 +1,154 @@
+"""Keeps the discord OAuth tokens stored in :class:`SteamUser` from expiring.
+
+Rows expiring within ``window`` are refreshed a batch at a time with at most ``concurrency`` requests in flight, and
+the new tokens are written back with a single ``UPDATE``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import datetime
+import logging
+from collections.abc import Iterable
+from typing import Any
+from uuid import UUID
+
+import aiohttp
+import discord
+from discord import http
+
+from light.db import SteamUser
+
+from .types import AccessTokenResponse, RefreshTokenExchange
+
+log = logging.getLogger("light.web")
+
+TOKEN_URL = f"{http.Route.BASE}/oauth2/token"
+
+
+@dataclasses.dataclass
+class RefreshedToken:
+    session_id: UUID
+    access_token: str
+    refresh_token: str
+    expires: datetime.datetime
+
+
+@dataclasses.dataclass
+class RefreshResult:
+    refreshed: int = 0
+    failed: int = 0
+
+
+class TokenRefresher:
+    def __init__(
+        self,
+        db: Any,
+        session: aiohttp.ClientSession,
+        client_id: str,
+        client_secret: str,
+        *,
+        token_url: str = TOKEN_URL,  # point this at a local stand-in to test without discord
+        window: datetime.timedelta = datetime.timedelta(days=1),
+        concurrency: int = 5,
+        batch_size: int = 500,
+    ) -> None:
+        self.db = db
+        self.session = session
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.window = window
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.batch_size = batch_size
+        self.total = RefreshResult()
+
+    async def run(self, interval: float) -> None:
+        while True:
+            try:
+                result = await self.refresh_expiring()
+            except Exception:
+                log.exception("Failed to refresh oauth tokens")
+            else:
+                if result.failed:
+                    log.warning(f"Refreshed {result.refreshed} oauth tokens, {result.failed} failed")
+                else:
+                    log.info(f"Refreshed {result.refreshed} oauth tokens")
+            await asyncio.sleep(interval)
+
+    async def refresh_expiring(self) -> RefreshResult:
+        """Refresh every token that expires within the window, a batch at a time."""
+        result = RefreshResult()
+        failed: set[UUID] = set()  # so rows that can't be refreshed aren't picked up by the next batch again
+        while True:
+            rows = await self.db.fetch(
+                f"""
+                SELECT session_id, refresh_token FROM {SteamUser._name}
+                WHERE expires < $1 AND NOT session_id = ANY($2::uuid[])
+                ORDER BY expires
+                LIMIT $3
+                """,
+                discord.utils.utcnow() + self.window,
+                list(failed),
+                self.batch_size,
+            )
+            if not rows:
+                break
+
+            tokens = await self.refresh_many((row.session_id, row.refresh_token) for row in rows)
+            await self.save(tokens)
+            refreshed = {token.session_id for token in tokens}
+            failed.update(row.session_id for row in rows if row.session_id not in refreshed)
+            result.refreshed += len(tokens)
+            result.failed += len(rows) - len(tokens)
+            if len(rows) < self.batch_size:
+                break
+
+        self.total.refreshed += result.refreshed
+        self.total.failed += result.failed
+        return result
+
+    async def refresh_many(self, rows: Iterable[tuple[UUID, str]]) -> list[RefreshedToken]:
+        tokens = await asyncio.gather(*(self.refresh(session_id, refresh_token) for session_id, refresh_token in rows))
+        return [token for token in tokens if token is not None]
+
+    async def refresh(self, session_id: UUID, refresh_token: str) -> RefreshedToken | None:
+        data: RefreshTokenExchange = {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        }
+        async with self.semaphore:
+            try:
+                async with self.session.post(self.token_url, data=data) as resp:
+                    resp.raise_for_status()
+                    response: AccessTokenResponse = await resp.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+                log.debug(f"Failed to refresh the oauth token for {session_id}: {exc}")
+                return None
+
+        return RefreshedToken(
+            session_id,
+            response["access_token"],
+            response["refresh_token"],
+            discord.utils.utcnow() + datetime.timedelta(seconds=response["expires_in"]),
+        )
+
+    async def save(self, tokens: list[RefreshedToken]) -> None:
+        if not tokens:
+            return
+        await self.db.execute(
+            f"""
+            UPDATE {SteamUser._name} AS users
+            SET access_token = new.access_token, refresh_token = new.refresh_token, expires = new.expires
+            FROM unnest($1::uuid[], $2::text[], $3::text[], $4::timestamptz[])
+                AS new(session_id, access_token, refresh_token, expires)
+            WHERE users.session_id = new.session_id
+            """,
+            [token.session_id for token in tokens],
+            [token.access_token for token in tokens],
+            [token.refresh_token for token in tokens],
+            [token.expires for token in tokens],
+        )